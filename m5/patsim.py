@@ -2,35 +2,30 @@ from os.path import join as pathjoin
 
 import core
 
+from m5mbridge.inputfile import openInput, splitRecords
 from m5mbridge.modules.mcpat import importer
 
+MCPAT_HEADER = 'McPAT (version 0.8 of Aug, 2010) results  (current print level is 5)'
+
 class PatEventSimulator(object):
     def __init__(self, mcpatLog = None):
         if not mcpatLog:
             mcpatLog = pathjoin(core.getOutputDir(), 'mcpat-test.log')
         self.mcpatLog = mcpatLog
-        self.dumps = []
-        self.readDumpsFromFile()
         self.nextDumpIdx = 0
+        self.pendingDump = None
+        self.readDumpsFromFile()
 
     def readDumpsFromFile(self):
-        lines = ''
-        with open(self.mcpatLog, 'r') as f:
-            lines = f.read()
-        self.dumps = lines.split('McPAT (version 0.8 of Aug, 2010) results  (current print level is 5)')
+        # The log is streamed and possibly compressed, only the next dump is
+        # kept in memory.
+        dumps = splitRecords(openInput(self.mcpatLog), MCPAT_HEADER)
 
         # Strip empty dumps
-        self.dumps = map(lambda x: x.strip(), self.dumps)
-        self.dumps = filter(len, self.dumps)
+        self.dumps = (dump for dump in (dump.strip() for dump in dumps) if dump)
 
         # Strip first dump, it's the 'McPat computing target processor' line.
-        del self.dumps[0]
-
-        for dump in self.dumps:
-            dump = 'McPAT (version 0.8 of Aug, 2010) results  (current print level is 5)' + dump
-
-        if len(self.dumps) <= 1:
-            print "WARNING: less than two dumps read from the McPat log file. Did the simple parser break, or is the input corrupted?"
+        next(self.dumps, None)
 
     def importPatData(self, controller):
         if not self.havePatData(): return
@@ -43,9 +38,17 @@ class PatEventSimulator(object):
         importer.importMcPatData(machine, dump)
 
     def havePatData(self):
-        return self.nextDumpIdx < len(self.dumps)
+        if self.pendingDump is None and self.dumps:
+            self.pendingDump = next(self.dumps, None)
+        if self.pendingDump is None and self.dumps:
+            # The end of the log.
+            self.dumps = None
+            if self.nextDumpIdx <= 1:
+                print "WARNING: less than two dumps read from the McPat log file. Did the simple parser break, or is the input corrupted?"
+        return self.pendingDump is not None
 
     def nextDump(self):
-        cur = self.nextDumpIdx
         self.nextDumpIdx += 1
-        return self.dumps[cur]
+        self.havePatData()
+        dump, self.pendingDump = self.pendingDump, None
+        return dump
@@ -2,6 +2,9 @@ from os.path import join as pathjoin
 
 import core
 
+from m5mbridge.inputfile import openInput, splitRecords
+from m5mbridge.modules.m5.importer.statsfile import BEGIN_DUMP_MARKER, StatsFile, hasStats, isStatsFile
+
 dumpListeners = []
 
 def registerDumpListener(listener):
@@ -17,22 +20,19 @@ class StatsDumpSimulator(object):
         if not path:
             path = pathjoin(core.getOutputDir(), 'stats.txt')
         self.path = path
-        self.dumps = []
-        self.readDumpsFromFile()
         self.nextDumpIdx = 0
-
-    def readDumpsFromFile(self):
-        lines = ''
-        with open(self.path, 'r') as f:
-            lines = f.read()
-        self.dumps = lines.split('---------- Begin Simulation Statistics ----------')
-
-        # Strip empty stats dumps
-        self.dumps = map(lambda x: x.strip(), self.dumps)
-        self.dumps = filter(len, self.dumps)
-
-        for dump in self.dumps:
-            dump = '---------- Begin Simulation Statistics ----------' + dump
+        self.statsFile = None
+        self.pendingDump = None
+        if isStatsFile(self.path):
+            # The stats file is memory-mapped and its dumps are read one at
+            # a time, see StatsFile.
+            self.statsFile = StatsFile(self.path)
+        else:
+            # Compressed stats files and stdin are streamed, only the next
+            # dump is kept in memory. Dumps without stats are skipped like
+            # StatsFile does.
+            dumps = splitRecords(openInput(self.path), BEGIN_DUMP_MARKER)
+            self.dumps = (dump.strip() for dump in dumps if hasStats(dump))
 
     def dumpOne(self):
         if not self.haveDump(): return
@@ -49,9 +49,17 @@ class StatsDumpSimulator(object):
             self.dumpOne()
 
     def haveDump(self):
-        return self.nextDumpIdx < len(self.dumps)
+        if self.statsFile is not None:
+            return self.nextDumpIdx < len(self.statsFile)
+        if self.pendingDump is None:
+            self.pendingDump = next(self.dumps, None)
+        return self.pendingDump is not None
 
     def nextDump(self):
         cur = self.nextDumpIdx
         self.nextDumpIdx += 1
-        return self.dumps[cur]
+        if self.statsFile is not None:
+            return self.statsFile.dump(cur).strip()
+        self.haveDump()
+        dump, self.pendingDump = self.pendingDump, None
+        return dump
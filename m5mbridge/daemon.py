@@ -0,0 +1,136 @@
+'''A conversion daemon and its client.
+
+Starting the Python interpreter, importing the m5mbridge and setting up the
+options and translators takes a significant amount of time compared to the
+conversion of a single run directory. The conversion daemon avoids this cost by
+serving conversion requests from a warm interpreter. Because the daemon is a
+long-running process, the in-process machine cache of the machinefactory
+module is reused for all requests with matching config files.
+
+The daemon listens on a Unix domain socket. A client connects, sends a single
+request and reads a single response, both are JSON objects terminated by a
+newline. A request has the following keys:
+
+  cwd  -- the directory in which the request is processed, typically the run
+          directory.
+  args -- a list of command line arguments. They are appended to the
+          daemon's own arguments, i.e., they override the daemon's options.
+
+The strings of a request are passed to the handler as UTF-8 encoded str, not
+as the unicode strings of the JSON decoder, because the options are used as
+str, e.g., the sim object names of -S are interned.
+
+A response has the following keys:
+
+  exit_code -- the exit code of the conversion.
+  stdout    -- the standard output of the conversion.
+  stderr    -- the standard error output of the conversion, i.e., warnings
+               and errors.
+
+This module does not import the machine or the simulator modules, so that a
+client does not have to import the rest of the m5mbridge.
+'''
+
+import errno
+import json
+import os
+import signal
+import socket
+import SocketServer
+import sys
+
+from m5mbridge import panic
+
+class ConversionServer(SocketServer.UnixStreamServer):
+    '''A Unix domain socket server that processes one request at a time.
+
+    The `handler' is called with the request dict and must return the
+    response dict.
+    '''
+    def __init__(self, socketPath, handler):
+        self.handler = handler
+        self.terminated = False
+        SocketServer.UnixStreamServer.__init__(self, socketPath, ConversionRequestHandler)
+
+    def terminate(self):
+        self.terminated = True
+        sys.exit(0)
+
+    def handle_error(self, request, client_address):
+        # The SystemExit of terminate() is caught like any other error if it
+        # is raised while a request is processed, or replaced by an error of
+        # the request, e.g., a broken pipe.
+        if self.terminated:
+            sys.exit(0)
+        SocketServer.UnixStreamServer.handle_error(self, request, client_address)
+
+class ConversionRequestHandler(SocketServer.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = encodeStrings(json.loads(line))
+            response = self.server.handler(request)
+        except ValueError, e:
+            response = dict(exit_code=2, stdout='', stderr='Error: malformed request: {0}\n'.format(e))
+        self.wfile.write(json.dumps(response) + '\n')
+        self.wfile.flush()
+
+def encodeStrings(value):
+    '''Return the decoded JSON `value' with its unicode strings encoded as
+    UTF-8 str.'''
+    t = type(value)
+    if t is unicode:
+        return value.encode('utf-8')
+    if t is list:
+        return [encodeStrings(item) for item in value]
+    if t is dict:
+        return dict((encodeStrings(k), encodeStrings(v)) for k, v in value.iteritems())
+    return value
+
+def serve(socketPath, handler):
+    '''Serve conversion requests on `socketPath' until interrupted or terminated.'''
+    removeStaleSocket(socketPath)
+    server = ConversionServer(socketPath, handler)
+    # Exit through SystemExit on SIGTERM, so that the socket file is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.terminate())
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(socketPath)
+
+def removeStaleSocket(socketPath):
+    '''Remove a socket file left behind by a daemon that did not exit cleanly.'''
+    if not os.path.exists(socketPath):
+        return
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(socketPath)
+    except socket.error, e:
+        if e.errno != errno.ECONNREFUSED:
+            raise
+        os.unlink(socketPath)
+        return
+    finally:
+        s.close()
+    panic("Another daemon is already listening on '{0}'.".format(socketPath))
+
+def request(socketPath, cwd, args):
+    '''Send a conversion request to the daemon and return its response.'''
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(socketPath)
+    except socket.error, e:
+        panic("Cannot connect to the daemon on '{0}': {1}".format(socketPath, e.strerror))
+    try:
+        f = s.makefile('r+')
+        f.write(json.dumps(dict(cwd=cwd, args=args)) + '\n')
+        f.flush()
+        line = f.readline()
+    finally:
+        s.close()
+    if not line:
+        panic("The daemon on '{0}' closed the connection without response.".format(socketPath))
+    return json.loads(line)
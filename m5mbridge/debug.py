@@ -23,8 +23,6 @@ For more information on the allowed command-line syntax see the docstring of
 enable_debugging_from_options.
 '''
 
-import inspect
-
 from m5mbridge import bug, warning
 
 DEBUGGABLE_PARTS = set([
@@ -32,13 +30,23 @@ DEBUGGABLE_PARTS = set([
     'all.controller',
     'all.controller.playback',
     'all.controller.recorder',
+    'all.inputfile',
     'all.modules',
     'all.modules.m5',
     'all.modules.m5.importer',
+    'all.modules.m5.importer.configjson',
     'all.modules.m5.importer.configparser',
     'all.modules.m5.importer.generatecalcparts',
     'all.modules.m5.importer.machinefactory',
+    'all.modules.m5.importer.parallelparser',
     'all.modules.m5.importer.stats',
+    'all.modules.m5.importer.statrouter',
+    'all.modules.m5.importer.statsarchive',
+    'all.modules.m5.importer.statsdelta',
+    'all.modules.m5.importer.statsfile',
+    'all.modules.m5.importer.statsmatrix',
+    'all.modules.m5.importer.statsfilter',
+    'all.modules.m5.importer.statspruner',
     'all.modules.m5.importer.translatorfactory',
     'all.modules.m5.exporter',
     'all.modules.mcpat',
@@ -46,6 +54,7 @@ DEBUGGABLE_PARTS = set([
     'all.modules.mcpat.importer.lexer',
     'all.modules.mcpat.importer.parser',
     'all.modules.mcpat.exporter',
+    'all.modules.mcpat.exporter.dvfs',
     'all.modules.mcpat.exporter.prunetree',
     'all.modules.mcpat.exporter.tree2mcpat',
     'all.modules.mcpat.exporter.tree2xml',
@@ -122,9 +131,12 @@ def enable_debugging_from_options(partrefList):
     withSubParts = filter(lambda x: not x.endswith('-'), partrefList)
     withoutSubParts = filter(lambda x: x.endswith('-'), partrefList)
 
-    # Reset, just in case.
+    # Reset, just in case. The conversion daemon parses the options of every
+    # request anew.
     global DEBUGGED_PARTS
     DEBUGGED_PARTS = set()
+    for part in DEBUG:
+        DEBUG[part] = False
 
     __enable_debugging_from_options(withSubParts)
     update_debugged_parts(__enabled)
@@ -206,6 +218,7 @@ def caller_name(fully_qualified = True):
     caller from our caller. Using this function makes the intention more clear
     than an ugly inspect.stack()[1][3] in our caller's code.
     '''
+    import inspect
     if fully_qualified:
         return __caller_name(3)
     return inspect.stack()[2][3]
@@ -220,6 +233,7 @@ def __caller_name(skip=2):
 
     Taken from https://gist.github.com/2151727 (License: public domain).
     '''
+    import inspect
     stack = inspect.stack()
     start = 0 + skip
     if len(stack) < start + 1:
@@ -0,0 +1,307 @@
+'''Transparent decompression of input files.
+
+Archived runs often keep their stats files, config files and McPat logs
+compressed, e.g., stats.txt.gz. openInput() opens an input file for reading
+and detects gzip, bzip2 and xz compression by the magic bytes at the start of
+the file, not by its name. Compressed files are decompressed in chunks while
+they are read, so that the memory needed does not depend on the size of the
+file. The path - reads from stdin, which may be compressed as well.
+
+For xz files the lzma module (Python 3 or the backports.lzma package) is used
+if it is installed, otherwise the xz command.
+
+The amount of decompressed data and the time spent decompressing it are
+recorded for every compressed file and reported with --profile_io, see
+profiling.reportIo().
+'''
+
+PARTREF = 'all.inputfile'
+
+import bz2
+import os
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+from m5mbridge import bug, panic, warning, debug
+
+# The magic bytes at the start of compressed files.
+MAGIC = [
+    ('\x1f\x8b', 'gzip'),
+    ('BZh', 'bz2'),
+    ('\xfd7zXZ\x00', 'xz'),
+]
+MAGIC_SIZE = max(len(magic) for (magic, format) in MAGIC)
+
+# The size of the chunks of compressed data that are decompressed at once.
+CHUNK_SIZE = 1 << 16
+
+def detectFormat(head):
+    '''Return the compression format of data starting with `head', or None
+    if it is not compressed.'''
+    for (magic, format) in MAGIC:
+        if head.startswith(magic):
+            return format
+    return None
+
+def compressionFormat(path):
+    '''Return the compression format of the file at `path', or None.'''
+    try:
+        with open(path, 'rb') as f:
+            return detectFormat(f.read(MAGIC_SIZE))
+    except IOError:
+        return None
+
+def openInput(path):
+    '''Open the input file at `path' for reading, decompressing it if it is
+    compressed. The path - is stdin.
+
+    Uncompressed regular files are returned as plain file objects and an
+    uncompressed seekable stdin as StdinFile. All other files are returned as
+    DecompressedFile, which supports iteration over lines, read(), readline()
+    and close(). Closing stdin never closes sys.stdin.
+    '''
+    if path == '-':
+        raw = sys.stdin
+        name = '<stdin>'
+    else:
+        raw = open(path, 'rb')
+        name = path
+
+    head = raw.read(MAGIC_SIZE)
+    format = detectFormat(head)
+    try:
+        raw.seek(0)
+        head = ''
+    except IOError:
+        # Not seekable, e.g., a pipe. Put the head in front of the data.
+        pass
+
+    if format is None and not head:
+        if raw is sys.stdin:
+            return StdinFile(raw)
+        return raw
+
+    debug.pp(PARTREF, 'reading {0} as {1}'.format(name, format or 'uncompressed stream'))
+    return DecompressedFile(raw, name, format, head)
+
+def splitRecords(lines, marker):
+    '''Split the lines of a file into records that start with a line
+    containing `marker', e.g., the stats dumps of a stats file. Yields the text
+    of every record without its marker line, starting with the text before
+    the first marker line. Only one record is kept in memory.'''
+    record = []
+    for line in lines:
+        if marker in line:
+            yield ''.join(record)
+            record = []
+        else:
+            record.append(line)
+    yield ''.join(record)
+
+class StdinFile(object):
+    '''An uncompressed stdin, which is left open when it is closed.'''
+    def __init__(self, file):
+        self.file = file
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def __iter__(self):
+        return iter(self.file)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class IdentityDecompressor(object):
+    '''A decompressor for uncompressed data.'''
+    unused_data = ''
+
+    def decompress(self, data):
+        return data
+
+def xzDecompressor():
+    '''Return an xz decompressor, or None if no lzma module is installed.'''
+    try:
+        import lzma
+    except ImportError:
+        try:
+            from backports import lzma
+        except ImportError:
+            return None
+    return lzma.LZMADecompressor()
+
+def createDecompressor(format):
+    if format == 'gzip':
+        # 16 selects the gzip header and trailer.
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif format == 'bz2':
+        return bz2.BZ2Decompressor()
+    elif format == 'xz':
+        return xzDecompressor()
+    return IdentityDecompressor()
+
+class DecompressedFile(object):
+    def __init__(self, raw, name, format, head=''):
+        self.name = name
+        self.format = format
+        self.raw = raw
+        self.head = head
+        self.process = None
+        # Counters for the profiling.
+        self.compressedBytes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.decompressor = createDecompressor(format)
+        if self.decompressor is None:
+            self.startXzProcess()
+        # The decompressed data, the data before pos has been read.
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def startXzProcess(self):
+        '''Decompress xz files with the xz command.'''
+        self.debug('no lzma module, using the xz command for {0}'.format(self.name))
+        try:
+            if not self.head and self.raw is not sys.stdin:
+                self.process = subprocess.Popen(['xz', '-dc'], stdin=self.raw, stdout=subprocess.PIPE)
+                self.compressedBytes = os.fstat(self.raw.fileno()).st_size
+            else:
+                self.process = subprocess.Popen(['xz', '-dc'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+                feeder = threading.Thread(target=self.feedXzProcess, args=(self.raw, self.head))
+                feeder.daemon = True
+                feeder.start()
+        except OSError, e:
+            panic("cannot decompress {0}: install backports.lzma or the xz command: {1}".format(self.name, e), 8)
+        self.raw = self.process.stdout
+        self.head = ''
+        self.decompressor = IdentityDecompressor()
+
+    def feedXzProcess(self, raw, head):
+        stdin = self.process.stdin
+        try:
+            stdin.write(head)
+            self.compressedBytes += len(head)
+            for chunk in iter(lambda: raw.read(CHUNK_SIZE), ''):
+                stdin.write(chunk)
+                self.compressedBytes += len(chunk)
+        except IOError:
+            # xz exited early, its exit status tells why.
+            pass
+        stdin.close()
+
+    def fill(self):
+        '''Decompress the next chunk into the buffer. Returns False at the end
+        of the file.'''
+        while not self.eof:
+            start = time.time()
+            data = self.head or self.raw.read(CHUNK_SIZE)
+            self.head = ''
+            if not data:
+                self.eof = True
+                self.checkXzProcess()
+                break
+            out = self.decompress(data)
+            self.seconds += time.time() - start
+            if not self.process:
+                # The xz command reads the compressed data itself, see
+                # startXzProcess().
+                self.compressedBytes += len(data)
+            self.bytes += len(out)
+            if out:
+                self.buf = self.buf[self.pos:] + out
+                self.pos = 0
+                return True
+        return False
+
+    def decompress(self, data):
+        out = []
+        while data:
+            try:
+                out.append(self.decompressor.decompress(data))
+            except EOFError:
+                # The previous stream ended right at the end of the last
+                # chunk and a new stream starts.
+                self.decompressor = createDecompressor(self.format)
+                continue
+            # Concatenated files, e.g., of cat a.gz b.gz, have several
+            # streams.
+            data = self.decompressor.unused_data
+            if data:
+                self.decompressor = createDecompressor(self.format)
+        return ''.join(out)
+
+    def checkXzProcess(self):
+        if self.process and self.process.wait() != 0:
+            panic("xz failed to decompress {0}.".format(self.name), 8)
+
+    def read(self, size=-1):
+        if size < 0:
+            chunks = [self.buf[self.pos:]]
+            self.buf = ''
+            self.pos = 0
+            while self.fill():
+                chunks.append(self.buf)
+                self.buf = ''
+            return ''.join(chunks)
+        while len(self.buf) - self.pos < size and self.fill():
+            pass
+        data = self.buf[self.pos:self.pos + size]
+        self.pos += len(data)
+        return data
+
+    def readline(self):
+        # Only the read position moves, the buffer is not copied for every
+        # line.
+        eol = self.buf.find('\n', self.pos)
+        while eol < 0 and self.fill():
+            eol = self.buf.find('\n', self.pos)
+        end = eol < 0 and len(self.buf) or eol + 1
+        line = self.buf[self.pos:end]
+        self.pos = end
+        return line
+
+    def __iter__(self):
+        while True:
+            lines = self.buf[self.pos:].splitlines(True)
+            self.pos = 0
+            if lines and not lines[-1].endswith('\n'):
+                # Keep the incomplete last line for the next chunk.
+                self.buf = lines.pop()
+            else:
+                self.buf = ''
+            for line in lines:
+                yield line
+            if not self.fill():
+                break
+        if self.buf:
+            line, self.buf = self.buf, ''
+            yield line
+
+    def close(self):
+        if self.format:
+            from m5mbridge import profiling
+            profiling.recordIo(self.name, self.format, self.compressedBytes, self.bytes, self.seconds)
+        if self.process:
+            self.process.stdout.close()
+            self.process.wait()
+        elif self.raw is not sys.stdin:
+            self.raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -7,6 +7,34 @@ class Machine(object):
         self.cht = cht
         self.sht = sht
         self.options = options
+        # Routes stats to components, see statrouter.statRouter().
+        self.statRouter = None
+        # The state of the incremental stats import, see M5StatsImporter:
+        # the keys of the last imported stats dict, the components whose
+        # calculated stats read other components and the ids of the
+        # components whose stats the last import changed, None if it
+        # replaced all stats.
+        self.importedStatKeys = None
+        self.calcDependents = None
+        self.dirtyComponents = None
+        # The StatsPruneReport of the last import with --prune_stats.
+        self.statsPruneReport = None
+
+    # The caches of the stats import, they are rebuilt by the next import.
+    CACHES = ('statRouter', 'importedStatKeys', 'calcDependents', 'dirtyComponents')
+
+    def __getstate__(self):
+        # The caches are not pickled, e.g., by the recorder for every event,
+        # an unpickled machine imports its next stats from scratch.
+        state = self.__dict__.copy()
+        for name in self.CACHES:
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for name in self.CACHES:
+            setattr(self, name, None)
 
     ## Forward the Component methods to the component tree's root object.
     def visit(self, visitor):
@@ -1,4 +1,5 @@
 from m5mbridge import bug, panic, warning
+from m5mbridge.machine.keytable import TableDict
 
 def sortComponentList(components):
     '''Sort a list of component objects by their name attribute.'''
@@ -55,17 +56,27 @@ class Component(object):
         self.params = params
         self.re_id=None
         self.re_name=None
-        self.translated_params = {}
-        self.translated_params_order = []
+        # The translated params and stats share their keys with the other
+        # components of the same translator class, see keytable.py.
+        self.translated_params = TableDict()
         self.children = []
         self.statistics = {}
-        self.translated_statistics = {}
+        self.translated_statistics = TableDict()
         self.calc_statistics = {}
         self.translator = None
-        self.translated_statistics_order=[]
         self.pat = None
         self.mcpat_export_conf = MCPAT_EXPORT_CONF.EXCLUDE
 
+    @property
+    def translated_params_order(self):
+        '''The keys of the translated params in the order of the translator.'''
+        return self.translated_params.keys()
+
+    @property
+    def translated_statistics_order(self):
+        '''The keys of the translated stats in the order of the translator.'''
+        return self.translated_statistics.keys()
+
     def visit(self, visitor):
         '''Pre order traversal of the component tree.'''
         visitor.visit(self)
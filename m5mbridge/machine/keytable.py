@@ -0,0 +1,150 @@
+'''Key tables shared by the translated params and stats of components.
+
+Every translated component has the same translated params and stats as all
+other components of its translator class, e.g., the 60 or so stats of a
+DerivO3CPU core. Storing them in a dict and an order list per component
+repeats the same hash table and the same keys for every core. Instead the
+components of a translator class share a KeyTable, the ordered keys, and
+every component stores its values in a TableDict, a list with one cell per
+key of the table.
+
+Key tables are immutable and shared through keyTable(), which returns the
+same table for the same keys. Adding a key to a TableDict moves the dict to
+the table with the additional key, the tables of other components are never
+changed. Unpickled tables are shared as well, e.g., the tables of all
+machines of a recorded event log.
+'''
+
+class KeyTable(object):
+    '''An immutable ordered table of keys, use keyTable() to create one.'''
+    __slots__ = ('keys', 'index')
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = dict((key, pos) for pos, key in enumerate(keys))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __reduce__(self):
+        return (keyTable, (self.keys,))
+
+# Maps tuples of keys to their KeyTable.
+keyTables = {}
+
+def keyTable(keys):
+    '''Return the shared KeyTable of the sequence `keys'.'''
+    keys = tuple(map(intern, keys))
+    table = keyTables.get(keys)
+    if table is None:
+        table = keyTables[keys] = KeyTable(keys)
+    return table
+
+EMPTY_TABLE = keyTable(())
+
+class Missing(object):
+    '''The value of the keys of a table that are not in a TableDict.'''
+    def __reduce__(self):
+        return 'MISSING'
+
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = Missing()
+
+class TableDict(object):
+    '''A dict of the keys of a KeyTable. Its keys are iterated in the order
+    of the table.'''
+    __slots__ = ('table', 'cells')
+
+    def __init__(self, table=None):
+        if table is None:
+            table = EMPTY_TABLE
+        self.table = table
+        self.cells = [MISSING] * len(table)
+
+    def __getstate__(self):
+        return (self.table, self.cells)
+
+    def __setstate__(self, state):
+        self.table, self.cells = state
+
+    def __getitem__(self, key):
+        pos = self.table.index.get(key)
+        if pos is None or self.cells[pos] is MISSING:
+            raise KeyError(key)
+        return self.cells[pos]
+
+    def get(self, key, default=None):
+        pos = self.table.index.get(key)
+        if pos is None or self.cells[pos] is MISSING:
+            return default
+        return self.cells[pos]
+
+    def __contains__(self, key):
+        pos = self.table.index.get(key)
+        return pos is not None and self.cells[pos] is not MISSING
+
+    has_key = __contains__
+
+    def __setitem__(self, key, value):
+        pos = self.table.index.get(key)
+        if pos is None:
+            self.insert(key, value)
+        else:
+            self.cells[pos] = value
+
+    def insert(self, key, value, after=None):
+        '''Set `key' to `value'. If `key' is not in the table, it is added
+        after the key `after', or at the end if there is no such key.'''
+        if key in self.table.index:
+            self[key] = value
+            return
+        keys = self.table.keys
+        pos = self.table.index.get(after, len(keys) - 1) + 1
+        self.table = keyTable(keys[:pos] + (key,) + keys[pos:])
+        self.cells.insert(pos, value)
+
+    def __delitem__(self, key):
+        if not key in self:
+            raise KeyError(key)
+        self.cells[self.table.index[key]] = MISSING
+
+    def clear(self):
+        self.cells = [MISSING] * len(self.table)
+
+    def __len__(self):
+        return len(self.cells) - self.cells.count(MISSING)
+
+    def iteritems(self):
+        for key, value in zip(self.table.keys, self.cells):
+            if value is not MISSING:
+                yield key, value
+
+    def iterkeys(self):
+        for key, value in self.iteritems():
+            yield key
+
+    __iter__ = iterkeys
+
+    def itervalues(self):
+        for key, value in self.iteritems():
+            yield value
+
+    def items(self):
+        return list(self.iteritems())
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def values(self):
+        return list(self.itervalues())
+
+    def __eq__(self, other):
+        return dict(self.iteritems()) == dict(other.iteritems())
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return '{' + ', '.join('{0!r}: {1!r}'.format(key, value) for key, value in self.iteritems()) + '}'
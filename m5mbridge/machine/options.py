@@ -7,6 +7,43 @@ from m5mbridge import bug, panic, warning, debug
 from m5mbridge import setup
 import optparse
 
+# Options that influence the machine model created from the config and stats
+# files.
+MACHINE_OPTIONS = [
+    'old_m5_stats',
+    'cpu_name',
+    'system_name',
+    'l1_cache_cpu_name',
+    'itb_name',
+    'dtb_name',
+    'interconn_names',
+    'mem_tech_node',
+    'core_tech_node',
+    'core_device_type',
+    'cache_device_type',
+    'interconnect_projection_type',
+    'sys_vdd_scale',
+]
+
+# Options that influence which files are read and written by a conversion.
+OUTPUT_OPTIONS = [
+    'm5dir',
+    'stats_fn',
+    'config_fn',
+    'summary_fn',
+    'power_fn',
+    'power_output',
+    'per_dump_output',
+    'stats_dump',
+    'stats_matrix_fn',
+    'stats_archive_fn',
+    'delta_stats',
+    'dfs_sweep',
+    'results_columns',
+    'full_stats',
+    'prune_stats',
+]
+
 class M5OptionParser(optparse.OptionParser):
     def error(self, msg):
         raise optparse.OptParseError(msg)
@@ -30,6 +67,8 @@ def checkArgs(parser, options):
         parser.error("--power-output requires a non-zero argument (see --help output).")
     if not 'systemConfig' in options.power_output:
         warning('--power-output should not be used without systemConfig argument (the generated XML file is not a valid McPat input file).')
+    if options.dfs_sweep and options.per_dump_output:
+        parser.error("--dfs_sweep cannot be combined with --per_dump_output.")
 
 def parse(args, usage=None):
     parser = M5OptionParser(
@@ -41,12 +80,33 @@ def parse(args, usage=None):
             default=False, help='Verbose output for McPat config.xml creation. Obsolete, use --debug=mcpat.exporter instead.')
     parser.add_option ('-f', '--process_run_dirs_by_filter', action='store',
             default=None, help="process a series of run directories by some specificed filter string")
+    parser.add_option('-j', '--jobs', action='store', type='int', default=1, help="process up to N run directories in parallel, each in its own worker process. Warnings and exit codes of the run directories are reported after all directories were processed. (default: 1)")
+    parser.add_option('--manifest_fn', action='store', type='string', default='.m5-mcpat-parser.manifest', help="the name of the manifest file in the current directory that records the input hashes of all run directories processed with --process_run_dirs_by_filter. Run directories with unchanged inputs are skipped. Use --manifest_fn= to disable the manifest.")
+    parser.add_option('--force', action='store_true', default=False, help="rebuild all run directories, even if the manifest shows that their inputs did not change")
+    parser.add_option('--machine_cache_dir', action='store', type='string', default=None, help="cache the machine models created from config files in this directory. Run directories with identical config files then only need to import their stats. Machines are always cached in-process.")
+    parser.add_option('--daemon', action='store', type='string', default=None, help="run as conversion daemon listening on the Unix domain socket at this path. The daemon converts run directories on behalf of clients started with --connect and avoids the interpreter startup and import cost for every conversion. The options of the daemon are the defaults for all requests.")
+    parser.add_option('--connect', action='store', type='string', default=None, help="send this conversion to the daemon listening on the Unix domain socket at this path instead of converting in-process. The conversion is run in the current directory and all other options override the options of the daemon.")
+    parser.add_option('--profile_imports', '--profile-imports', action='store_true', default=False, help="print the time spent importing modules to stderr after the conversion. The modules with the highest self time are listed first.")
+    parser.add_option('--parse_workers', '--parse-workers', action='store', type='int', default=1, help="parse stats files of 128MB or more with up to N worker processes. The stats file is split into chunks of complete lines, which are parsed in parallel and merged in the order of the file. Applies to the merged conversion of all dumps of uncompressed regular stats files. Ignored in the worker processes of --jobs. The workers are only faster than a single process with at least as many idle CPU cores as workers, on a single core they are slower. (default: 1)")
+    parser.add_option('--profile_io', action='store_true', default=False, help="print the decompression throughput of every compressed input file to stderr after the conversion. Input files compressed with gzip, bzip2 or xz are detected and decompressed while they are read. Files read by the worker processes of --jobs are not included.")
+    parser.add_option('--import_budget', action='store', type='float', default=None, help="warn if importing modules takes more than this many milliseconds. Use it to keep the cold start of short conversions in check.")
     parser.add_option('--old_m5_stats', action="store_true", default=False, help='processing old m5 stats')
     parser.add_option('-c', '--cpu_name', action='store', type='string', default="switch_cpus", help="the string used cpu comparisons")
-    parser.add_option('-s', '--stats_fn', action='store', type='string', default='stats.txt', help="the name of the stats file to use. Use -s /dev/stdin to read from stdin and --stats_fn= to skip stats.")
-    parser.add_option('-C', '--config_fn', action='store', type='string', default='config.ini', help="the name of the config file to use")
+    parser.add_option('-s', '--stats_fn', action='store', type='string', default='stats.txt', help="the name of the stats file to use. Use -s - or -s /dev/stdin to read from stdin and --stats_fn= to skip stats. The stats file may be compressed with gzip, bzip2 or xz, e.g., stats.txt.gz.")
+    parser.add_option('-C', '--config_fn', action='store', type='string', default='config.ini', help="the name of the config file to use. Use -C - to read from stdin. The config file may be compressed with gzip, bzip2 or xz, e.g., config.ini.gz. A config file ending in .json, e.g., config.json, is read as the config.json of gem5 instead, which has the same machine description.")
     parser.add_option('-y', '--summary_fn', action='store', type='string', default='summary.xml', help="the name of the summary output file name. Use --summary_fn= to inhibit.")
     parser.add_option('-p', '--power_fn', action='store', type='string', default='power.xml', help="the name of the McPAT config output file name. Use -p /dev/stdout to write to stdout.")
+    parser.add_option('--full_stats', action='store_true', default=False, help="keep all stats of the stats file. By default only the stats read by the translators and the calculated stats are kept, which makes parsing faster but leaves all other stats out of summary.xml.")
+    parser.add_option('--prune_stats', action='store_true', default=False, help="drop the stats of every component that neither its translator nor the calculated stats read right after the stats are imported, e.g., to shrink the machine of the live bridge, which is pickled on every recorded event. The dropped stats are left out of summary.xml. With -v the number of retained and discarded stats and the memory they use is printed.")
+    parser.add_option('--per_dump_output', action='store', type='choice', choices=['', 'files', 'single'], default='', help="convert every stats dump of the stats file instead of merging all dumps. 'files' writes the dumps to numbered files, e.g., power_0.xml, power_1.xml, etc. 'single' writes one XML document per dump into the same file. The machine is created only once for all dumps. (default: merge all dumps)")
+    parser.add_option('--stats_dump', action='store', type='int', default=None, help="convert only stats dump N of the stats file instead of merging all dumps. The dumps are numbered from 0 in the order of the stats file, dumps without any stats are not counted, so a stats file, its compressed copy and its stats archive have the same numbers. Negative numbers count from the end, e.g., -1 is the last dump. The dumps are located by an index of their offsets in the stats file, so the other dumps are never read, see --dump_index_dir. Requires a regular stats file, i.e., -s /dev/stdin only works if stdin is redirected from a file. With --per_dump_output only dump N is written.")
+    parser.add_option('--dump_index_dir', action='store', type='string', default=None, help="cache the indexes of the dumps of the stats files in this directory, so that --stats_dump and --per_dump_output do not have to scan a stats file again. The directories of the stats files are never written to. (default: no cache)")
+    parser.add_option('--stats_matrix_fn', action='store', type='string', default='', help="write the stats of all dumps of the stats file to a NumPy archive of this name in the run directory, e.g., stats.npz. The archive holds the array stats of shape dumps x columns with one column per stat and NaN for missing values, the stat names of the columns in the array columns, e.g., system.cpu0.numCycles, and the numbers of the dumps in the array dumps. The columns include the calculated stats, e.g., system.cpu0.num_busy_cycles. Requires NumPy and a stats file, i.e., not -s -.")
+    parser.add_option('--stats_archive_fn', action='store', type='string', default='', help="write all stats of all dumps of the stats file to a binary stats archive of this name in the run directory, e.g., stats.m5a. A stats archive can be given as stats file, e.g., -s stats.m5a, to convert the stats again without parsing the stats file. The dumps of an archive are numbered without the empty dumps of the stats file. Requires NumPy and a stats file, i.e., not -s -.")
+    parser.add_option('--delta_stats', action='store_true', default=False, help="convert the stats of every dump into the stats of the interval since the previous dump. Use it if gem5 dumps the stats without resetting them, so that the stats of a dump are cumulative. Counters are replaced by the difference to the previous dump, averages, rates and other gauges are kept as they are. Applies to --per_dump_output, --stats_dump and --stats_matrix_fn, a merged conversion of all dumps is not affected.")
+    parser.add_option('--dfs_sweep', action='store', type='string', default='', help="a comma separated list of DFS factors, e.g., 1,0.73,0.54. In addition to power.xml, a McPAT config file is written for every DVFS operating point, named after the DFS factor in percent, e.g., power_dfs73.xml, with the core clock rates scaled by the DFS factor and sys_vdd_scale set to the matching voltage scaling. The config and stats files are only imported once for all operating points, which are written by up to --jobs worker processes. The DFS factors must differ in percent. Cannot be combined with --per_dump_output.")
+    parser.add_option('--results_fn', action='store', type='string', default='', help="write one results file for all processed run directories with one row per run directory and one column per translated param or statistic, e.g., system.cpu0.committed_instructions. Files ending in .npz are written as NumPy archive with one array per column, all other files as CSV. The file is written once at the end. Skipped run directories keep their row of the previous results file.")
+    parser.add_option('--results_columns', action='store', type='string', default='*', help="a comma separated list of shell-style patterns selecting the columns of the results file, e.g., 'system.cpu*.committed_instructions,system.core_tech_node'. (default: all columns)")
     parser.add_option('-S', '--system_name', action='store', type='string', default='system', help="the name the system we are consider for stats")
     parser.add_option('-l', '--l1_cache_cpu_name', action='store', type='string', default='cpu', help="the name of the cpu to which the l1 dcache and icache were first attached")
     parser.add_option('-i', '--itb_name', action='store', type='string', default='itb', help="The name associated with M5's itb")
@@ -0,0 +1,49 @@
+'''Numeric values of access statistics.
+
+The values of component.statistics and component.translated_statistics are
+numbers: the stats parser converts the value of a stat once into an int, e.g.,
+1234, or a float, e.g., 0.000100, and calculated stats are computed from and
+stored as numbers. A stat that gem5 could not compute is the float nan or inf,
+which isRealNumber() tells apart from real numbers. Values that are neither,
+e.g., the default value NaV of a translated stat, stay strings.
+
+Values become strings only when they are serialized, e.g., to summary.xml or
+power.xml, using formatStatValue().
+'''
+
+import math
+
+def parseStatValue(text):
+    '''Convert the value of a stat of the stats file into an int or a float.
+    Text that is not a number is returned as it is.'''
+    # Most stats are counters, the checks avoid raising a ValueError for
+    # every float.
+    if text.isdigit():
+        return int(text)
+    if not '.' in text:
+        try:
+            return int(text)
+        except ValueError:
+            pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def formatStatValue(value):
+    '''Convert a stat value into the string written to output files.'''
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return str(value)
+        # repr() is the shortest string that reads back as the same float,
+        # str() would round to 12 digits.
+        return repr(value)
+    if isinstance(value, (int, long)):
+        return str(value)
+    return value
+
+def isRealNumber(value):
+    '''Return True if `value' is a number that is neither NaN nor +-Inf.'''
+    if isinstance(value, float):
+        return not (math.isnan(value) or math.isinf(value))
+    return isinstance(value, (int, long))
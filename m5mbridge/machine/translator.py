@@ -1,8 +1,9 @@
-from orca.scripts import default
 import re
 import traceback
 from m5mbridge import bug, panic, warning
 from m5mbridge.machine.component import Component
+from m5mbridge.machine.keytable import TableDict, keyTable
+from m5mbridge.machine.statvalue import isRealNumber
 
 '''
 class Translator is used for finding and adding params and stats
@@ -64,6 +65,7 @@ class Translator(object):
     from m5 parameters to the equivalent power model name
     '''
     def translate_params(self, component):
+        component.translated_params = TableDict(keyTable(self.power_params_order))
         for power_param_key in self.power_params_order:
             power_param = self.power_params[power_param_key]
             #grab M5's version of the parameter needed and translate it to power file name
@@ -74,7 +76,6 @@ class Translator(object):
     '''
     def translate_param(self, component, power_param, key):
         #find the translated value if it exists
-        component.translated_params_order.append(key)
         try:
             component.translated_params[key] = component.params[power_param[Translator.M5_PARAM]]
         except:
@@ -86,6 +87,7 @@ class Translator(object):
     from m5 statistics to the equivalent power model statistics
     '''
     def translate_statistics(self, component):
+        component.translated_statistics = TableDict(keyTable(self.power_statistics_order))
         for power_stat_key in self.power_statistics_order:
             power_stat = self.power_statistics[power_stat_key]
             #grab M5's version of the statistic needed and translate it to power file stat
@@ -97,7 +99,6 @@ class Translator(object):
     '''
     def translate_statistic(self, component, power_stat, key):
         #find the translated value if it exists
-        component.translated_statistics_order.append(key)
         try:
             component.translated_statistics[key] = self.get_component_statistic(component, power_stat[Translator.M5_STAT])
         except KeyError:
@@ -155,7 +156,12 @@ class Translator(object):
 
 
 def is_number(num):
-    '''Check if the given string is a real floating point number, i.e., it's a float and not NaN or +-Inf.'''
+    '''Check if the given stat value is a real number, i.e., it's not NaN or +-Inf.
+
+    Stat values are numbers (see statvalue.py), but strings are still
+    accepted.'''
+    if not isinstance(num, basestring):
+        return isRealNumber(num)
     try:
         f = float(num)
         return num != 'inf' and num != 'nan'
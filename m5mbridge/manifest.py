@@ -0,0 +1,98 @@
+'''A content-hash manifest for incremental batch conversions.
+
+The manifest records for every run directory of a sweep a hash of the inputs
+of its conversion, i.e., the config file, the stats file and the options that
+influence the generated files. If the manifest's hash of a run directory is
+still equal to the hash of the current inputs, then the outputs of the last
+conversion are still valid and the run directory can be skipped. The hash
+includes OUTPUT_VERSION, so that the outputs are rebuilt after an upgrade that
+changes the translators or exporters.
+
+The manifest is a text file with one line per run directory. Each line
+consists of the hex digest and the name of the run directory separated by a
+single space.
+'''
+
+import hashlib
+import os
+
+from m5mbridge import warning
+
+# Part of every digest, changes whenever the generated files of unchanged
+# inputs change, e.g., because of a new translator.
+OUTPUT_VERSION = 1
+
+class Manifest(object):
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.skipped = 0
+        self.rebuilt = 0
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.rstrip('\n')
+                if not line:
+                    continue
+                try:
+                    digest, dir = line.split(' ', 1)
+                except ValueError:
+                    warning("Ignoring malformed manifest line '{0}' in {1}.".format(line, self.path))
+                    continue
+                self.entries[dir] = digest
+
+    def save(self):
+        # Write to a temporary file first, an interrupted conversion must not
+        # leave a truncated manifest behind.
+        tmpPath = self.path + '.tmp'
+        with open(tmpPath, 'w') as f:
+            for dir in sorted(self.entries):
+                f.write('{0} {1}\n'.format(self.entries[dir], dir))
+        os.rename(tmpPath, self.path)
+
+    def upToDate(self, dir, digest):
+        return digest is not None and self.entries.get(dir) == digest
+
+    def skip(self, dir):
+        self.skipped += 1
+
+    def update(self, dir, digest):
+        '''Record the digest of a successfully rebuilt run directory.'''
+        self.rebuilt += 1
+        if digest is None:
+            self.entries.pop(dir, None)
+        else:
+            self.entries[dir] = digest
+
+    def report(self):
+        return 'skipped {0} unchanged run directories, rebuilt {1}'.format(self.skipped, self.rebuilt)
+
+def inputDigest(paths, options, optionNames):
+    '''Return a hex digest of the given input files and option values.
+
+    Returns None if one of the inputs cannot be hashed, e.g., if it is read
+    from stdin. Missing files are hashed as missing, so that a run directory is
+    rebuilt once the file appears.
+    '''
+    h = hashlib.sha1()
+    h.update('version={0}\0'.format(OUTPUT_VERSION))
+    for path in paths:
+        if path is None:
+            h.update('<none>\0')
+        elif path.startswith('/dev/') or path == '-':
+            return None
+        elif not os.path.exists(path):
+            h.update('<missing>\0')
+        else:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), ''):
+                    h.update(chunk)
+            h.update('\0')
+    for name in optionNames:
+        h.update('{0}={1!r}\0'.format(name, getattr(options, name, None)))
+    return h.hexdigest()
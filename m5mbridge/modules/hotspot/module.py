@@ -1,12 +1,20 @@
 from os.path import dirname, join as pathjoin
 import re
 
-import hotspot
-
 import floorplan
 
+# The hotspot extension is imported by importHotspot() when the first
+# HotspotModule is created, importing this file does not require it.
+hotspot = None
+
+def importHotspot():
+    global hotspot
+    import hotspot
+
 class HotspotModule(object):
     def __init__(self, flpFile = None):
+        importHotspot()
+
         plan = None
         if flpFile:
             with open(flpFile, 'r') as f:
@@ -73,9 +81,9 @@ class HotspotModule(object):
     def getPower(self, component):
         if not component.pat: return
 
-        # Values of the power dictionary are of the form ('0.0853658', 'W').
-        leakage = float(component.pat.power['Gate Leakage'][0])
-        dynamic = float(component.pat.power['Runtime Dynamic'][0])
+        # Values of the power dictionary are of the form (0.0853658, 'W').
+        leakage = component.pat.power['Gate Leakage'][0]
+        dynamic = component.pat.power['Runtime Dynamic'][0]
 
         return leakage + dynamic
 
@@ -67,6 +67,7 @@ the format of Gnuplot input files and makes machine-parsing easy.
 '''
 
 from m5mbridge.machine.visitor import Visitor
+from m5mbridge.machine.statvalue import formatStatValue
 from cStringIO import StringIO
 
 def tree2DataTable(machine):
@@ -104,7 +105,7 @@ class Tree2DataTable(Visitor):
         self.writeComponentPowerData(component)
 
     def writeTimeInterval(self, component):
-        self.buf.write("# time (seconds): {0}\n".format(component.statistics['sim_seconds']))
+        self.buf.write("# time (seconds): {0}\n".format(formatStatValue(component.statistics['sim_seconds'])))
 
     def writeComponentHeader(self, component):
         name = self.componentName(component)
@@ -128,7 +129,7 @@ class Tree2DataTable(Visitor):
 
     def writeComponentPowerData(self, component):
         power = component.pat.power
-        values = "\t".join([power[ptype][0] for ptype in self.POWER_TYPES])
+        values = "\t".join([formatStatValue(power[ptype][0]) for ptype in self.POWER_TYPES])
         self.buf.write("{0}".format(values))
         self.buf.write("\n")
 
@@ -0,0 +1,211 @@
+'''A parser for the config.json of gem5.
+
+Besides the config.ini gem5 writes the same machine description as
+config.json, in which every SimObject is a JSON object holding its params and
+its children, i.e., the SimObject hierarchy is already nested:
+
+  {"type": "Root", "path": "root", "name": "root", ...,
+   "system": {"type": "System", "path": "system", "name": "system", ...,
+              "cpu": [{"type": "DerivO3CPU", "path": "system.cpu0", ...},
+                      ...]}}
+
+A child is a JSON object with a type, a vector of children is a list of such
+objects. Ports are JSON objects without a type, e.g., {"role": "MASTER",
+"peer": "system.membus.slave[0]"}.
+
+The parser walks the objects and creates the same components and the same
+component tree as the M5ConfigParser does for the config.ini: the id of a
+component is the path of its object, the params are converted to the strings
+of the config.ini, e.g., true for true, 1 2 for [1, 2] and the peer of a
+port, and the children param lists the names of the children sorted as
+strings, e.g., cpu0 cpu1 cpu10 cpu2, like gem5 lists them in the config.ini.
+
+The key of a child is a param with the path of the child, or the paths of a
+vector of children, e.g., physmem=system.physmem, like the SimObject params of
+the config.ini. The config.json does not tell SimObject params from other
+children, so unlike the config.ini the components also have a param for
+every child that is not a SimObject param, e.g., cpu=system.cpu0 system.cpu1.
+The config.json also keeps values with more than one '=' intact, e.g.,
+boot_osflags, which the M5ConfigParser cuts at the second '='.
+
+JSON objects are read as lists of their items, which keeps the order of the
+params and the children and is faster than building dicts. Loading a
+config.json allocates a container for every object and item, the garbage
+collector is paused while the objects are loaded and walked, otherwise it
+scans the growing tree over and over and takes more time than the parsing.
+'''
+
+PARTREF = 'all.modules.m5.importer.configjson'
+
+import gc
+import json
+import os
+
+from m5mbridge import panic, warning, debug
+from m5mbridge.machine.translator import Translator
+
+JSON_SUFFIX = '.json'
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+def isJsonConfig(config_file_path, config):
+    '''Return True if the config read from `config_file_path' is a
+    config.json, e.g., config.json or config.json.gz. The config read from
+    stdin is a config.json if it starts with a JSON object.'''
+    root, ext = os.path.splitext(config_file_path)
+    if ext in COMPRESSION_SUFFIXES:
+        root, ext = os.path.splitext(root)
+    if ext == JSON_SUFFIX:
+        return True
+    return config_file_path == '-' and config.lstrip()[:1] == '{'
+
+# Items of SimObjects that are not params.
+NO_PARAMS = ('name', 'path')
+
+class JsonObject(list):
+    '''The (key, value) items of a JSON object in the order of the file.'''
+    pass
+
+def isSimObject(value):
+    '''Return True if `value' is a SimObject, i.e., a JSON object with a
+    type.'''
+    if type(value) is not JsonObject:
+        return False
+    for key, item in value:
+        if key == 'type':
+            return True
+    return False
+
+def paramValue(value):
+    '''Return `value' as it is written to the config.ini.'''
+    t = type(value)
+    if t is unicode:
+        return value.encode('utf-8')
+    if t is bool:
+        return value and 'true' or 'false'
+    if value is None:
+        return 'Null'
+    if t is JsonObject:
+        # A port, its value is its peer.
+        for key, item in value:
+            if key == 'peer':
+                return paramValue(item)
+        return ' '.join(paramValue(item) for key, item in value)
+    if t is list:
+        return ' '.join(paramValue(item) for item in value)
+    return str(value)
+
+def childPath(obj, parent_id):
+    '''Return the name and the path of the child SimObject `obj' of the
+    SimObject with the id `parent_id'.'''
+    name = path = None
+    for key, value in obj:
+        if key == 'name':
+            name = paramValue(value)
+        elif key == 'path':
+            path = paramValue(value)
+    if path is None:
+        if parent_id == 'root':
+            path = name
+        else:
+            path = '%s.%s' % (parent_id, name)
+    elif name is None:
+        name = path.split('.')[-1]
+    return name, path
+
+class M5ConfigJsonParser(object):
+    def __init__(self, config_file, options):
+        self.config_file = config_file
+        self.options = options
+        # Maps the keys of the JSON objects to the interned param names.
+        self.names = {}
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def run(self):
+        '''Return a dict mapping the ids of the SimObjects to their
+        components, the children of the components are linked.'''
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            try:
+                root = json.load(self.config_file, object_pairs_hook=JsonObject)
+            except ValueError, e:
+                panic("invalid config.json: {0}".format(e), 8)
+            if not isSimObject(root):
+                panic("invalid config.json: the root is not a SimObject.", 8)
+            cht = {}
+            self.createComponent(cht, root, 'root')
+        finally:
+            if collecting:
+                gc.enable()
+        return cht
+
+    def param(self, key):
+        # All components of a type have the same params, their names are
+        # interned to share them.
+        param = self.names.get(key)
+        if param is None:
+            param = self.names[key] = intern(str(key))
+        return param
+
+    def createComponent(self, cht, obj, id):
+        '''Create the component of the SimObject `obj' with the id `id' and
+        the components of its children.'''
+        items = []
+        # The (key, SimObjects) of the children.
+        childItems = []
+        for key, value in obj:
+            t = type(value)
+            if t is unicode:
+                value = value.encode('utf-8')
+            elif t is JsonObject and isSimObject(value):
+                childItems.append((key, [value]))
+                continue
+            elif t is list and value and isSimObject(value[0]):
+                childItems.append((key, value))
+                continue
+            else:
+                value = paramValue(value)
+
+            if not key in NO_PARAMS:
+                items.append((self.param(key), value))
+
+        children = []
+        for key, objs in childItems:
+            paths = []
+            for child in objs:
+                name, path = childPath(child, id)
+                children.append((name, path, child))
+                paths.append(path)
+            items.append((self.param(key), ' '.join(paths)))
+        children.sort(key=lambda (name, path, child): name)
+
+        # The params are added in the order of the config.ini, i.e., type and
+        # children first, so that they are iterated in the same order.
+        params = {}
+        for key, value in items:
+            if key == 'type':
+                params[key] = value
+        if children:
+            params['children'] = ' '.join(name for name, path, child in children)
+        params.update(items)
+
+        debugging = debug.enabled(PARTREF)
+        if debugging:
+            self.debug('creating component {0} with params = {1}'.format(id, params))
+        if id in cht:
+            warning("Identical component id '{0}' occurs twice! Invalid Config".format(id))
+        component = cht[id] = Translator.createComponent(id, params)
+
+        for name, path, child in children:
+            child = self.createComponent(cht, child, path)
+            # For the x86 system Gem5 generates a broken config, the terminal
+            # component is not a children of the system component, see
+            # configparser.py.
+            if 'terminal' in path:
+                if debugging:
+                    self.debug('skipping child {0}'.format(path))
+                continue
+            component.children.append(child)
+        return component
@@ -1,3 +1,17 @@
+'''A parser for the config.ini of gem5.
+
+The config.ini has a section per SimObject, e.g., [system.cpu0], followed by
+its params, e.g., type=DerivO3CPU, and an empty line. The parser creates a
+component per section and links the components into a tree as it reads the
+sections: the children param of a section lists the names of its children,
+e.g., children=dcache icache, whose ids are the id of the section and the
+name, e.g., system.cpu0.dcache. The children of the root section are ids.
+
+A child is usually defined after its parent. The parser reserves a slot in
+the children of the parent for every child and fills the slot when the child
+is created, only children that are never defined are reported at the end.
+'''
+
 PARTREF = 'all.modules.m5.importer.configparser'
 
 from m5mbridge import panic, warning, debug
@@ -12,32 +26,74 @@ class M5ConfigParser(object):
         debug.pp(PARTREF, *args)
 
     def run(self):
+        '''Return a dict mapping the ids of the sections to their components,
+        the children of the components are linked.'''
         cht = {}
+        # Maps the ids of children to the (parent, index) of their slots in
+        # the children of their parents.
+        slots = {}
         id = None #the id of current system component
         params = {} #params set for the current config
 
         #add all the components to the dictionary
         for line in self.config_file:
+            key, sep, value = line.partition('=')
+            if sep:
+                #grab the param
+                if id:
+                    if '=' in value:
+                        if key != 'boot_osflags':
+                            warning("A param with more than one '=' occurred: %s. parts=%d" %(line, line.count('=')+1))
+                        value = value.partition('=')[0]
+                    # All components of a type have the same params, their
+                    # names are interned to share them.
+                    params[intern(key)]=value.rstrip()
 
             #look for a new param id
-            if '[' in line and ']' in line and '=' not in line:
+            elif '[' in line and ']' in line:
                 id = line.rstrip().rstrip(']').lstrip('[')
-                if  cht.has_key(id):
+                if id in cht:
                     warning("Identical component id '{0}' occurs twice! Invalid Config".format(id))
 
-            #find params for id
+            #assume that a newline or line without an = is the beginning of the next component
             elif id:
-                temp = line.split('=')
-                #assume that a newline or line without an = is the beginning of the next component
-                if len(temp) == 0 or len(temp) == 1:
-                    self.debug('creating component {0} with params = {1}'.format(id, params))
-                    cht[id]=Translator.createComponent(id, params)
-                    params = {}
-                    id = None
-                #grab the param
-                else:
-                    if len(temp) != 2 and temp[0] != 'boot_osflags':
-                        warning("A param with more than one '=' occurred: %s. parts=%d" %(line, len(temp)))
-                    params[temp[0]]=temp[1].rstrip()
+                self.createComponent(cht, slots, id, params)
+                params = {}
+                id = None
+
+        for child_id in slots:
+            if not child_id in cht:
+                panic("child_id %s does not exist." %(child_id),5)
         # Return the component hash
         return cht
+
+    def createComponent(self, cht, slots, id, params):
+        debugging = debug.enabled(PARTREF)
+        if debugging:
+            self.debug('creating component {0} with params = {1}'.format(id, params))
+        component = cht[id] = Translator.createComponent(id, params)
+
+        if 'children' in params:
+            for child in params['children'].split():
+                if id == "root":
+                    child_id = child
+                else:
+                    child_id = "%s.%s" %(id, child)
+
+                # For the x86 system Gem5 generates a broken config.ini, the
+                # terminal component is not a children of the system component.
+                # To fix the hierarchy, we just ignore it. The terminal is not
+                # important for the statistics.
+                if 'terminal' in child_id:
+                    if debugging:
+                        self.debug('skipping child {0}'.format(child_id))
+                    continue
+
+                # The slot is None until the child is created.
+                slots.setdefault(child_id, []).append((component, len(component.children)))
+                component.children.append(cht.get(child_id))
+
+        # A component defined twice replaces the first one in its parent,
+        # like it replaces it in cht.
+        for parent, index in slots.get(id, ()):
+            parent.children[index] = component
@@ -425,9 +425,31 @@ def getPorts(component):
         ports.extend(component.params['slave'].split())
         return ports
 
-
-def generateCalcStats(options, cht, sht):
-    for c_key in cht:
+# The stats read by generateCalcStats(). The stats parser drops all stats that
+# are not read by the translators or listed here, see statsfilter.py for the
+# syntax. Update this list if generateCalcStats() reads more stats.
+CALC_STATS = [
+    # AlphaTLB
+    'data_hits', 'data_misses', 'fetch_hits', 'fetch_misses',
+    'write_hits', 'write_misses', 'read_hits', 'read_misses',
+    # Mesh2D
+    '*routing_counts*',
+    # BTB
+    'BPredUnit.lookups', 'BPredUnit.BTBHits',
+    # DerivO3CPU
+    'iq.FU_type_0::*', 'commit.count', 'commit:count', 'numCycles', 'idleCycles',
+    # Dir_config
+    'directory_transactions::*',
+    # PhysicalMemory, SimpleMemory and mc
+    'num_reads', 'num_writes', 'num_phys_mem_reads', 'num_phys_mem_writes',
+]
+
+def generateCalcStats(options, cht, sht, componentIds=None):
+    '''Add the calculated stats to the components of cht. If `componentIds'
+    is given, only the components with these ids are updated.'''
+    if componentIds is None:
+        componentIds = cht
+    for c_key in componentIds:
         component = cht[c_key]
         ptype = component.params['type']
 
@@ -441,9 +463,9 @@ def generateCalcStats(options, cht, sht):
             write_misses=tryGrabComponentStat(component, "write_misses", conversion="int")
             read_hits=tryGrabComponentStat(component, "read_hits", conversion="int")
             read_misses=tryGrabComponentStat(component, "read_misses", conversion="int")
-            component.statistics["total_accesses"] = str(data_hits+ data_misses + fetch_hits + fetch_misses)
-            component.statistics["write_accesses"] = str(write_hits+write_misses)
-            component.statistics["read_accesses"] = str(read_hits+read_misses)
+            component.statistics["total_accesses"] = data_hits+ data_misses + fetch_hits + fetch_misses
+            component.statistics["write_accesses"] = write_hits+write_misses
+            component.statistics["read_accesses"] = read_hits+read_misses
 
         elif ptype == 'Mesh2D':
             component.statistics["total_routing_counts"] = 0
@@ -451,7 +473,7 @@ def generateCalcStats(options, cht, sht):
                 if "routing_counts" in stat_key:
                     stat = component.statistics[stat_key]
                     component.statistics["total_routing_counts"] += int(stat)
-            component.statistics["total_routing_counts"] = str(tryGrabComponentStat(component, "total_routing_counts", conversion="int"))
+            component.statistics["total_routing_counts"] = tryGrabComponentStat(component, "total_routing_counts", conversion="int")
 
         elif ptype == "BTB":
             # If we have an O3 CPU model we can take it from its branch
@@ -459,50 +481,50 @@ def generateCalcStats(options, cht, sht):
             # it to zero.
             if hasattr(component, 'cpu'):
                 cpu = component.associated_cpu # Set in generateCalcComponents
-                component.statistics["total_accesses"] = str(tryGrabComponentStat(cpu, "BPredUnit.lookups", conversion="int"))
-                component.statistics["total_hits"] = str(tryGrabComponentStat(cpu, "BPredUnit.BTBHits", conversion="int"))
-                component.statistics["total_misses"] = str(tryGrabComponentStat(cpu, "BPredUnit.lookups", conversion="int") - tryGrabComponentStat(cpu, "BPredUnit.BTBHits", conversion="int"))
+                component.statistics["total_accesses"] = tryGrabComponentStat(cpu, "BPredUnit.lookups", conversion="int")
+                component.statistics["total_hits"] = tryGrabComponentStat(cpu, "BPredUnit.BTBHits", conversion="int")
+                component.statistics["total_misses"] = tryGrabComponentStat(cpu, "BPredUnit.lookups", conversion="int") - tryGrabComponentStat(cpu, "BPredUnit.BTBHits", conversion="int")
             else:
-                component.statistics["total_accesses"] = "0"#component.statistics["BPredUnit.lookups"]
-                component.statistics["total_hits"] = "0"#component.statistics["BPredUnit.BTBHits"]
-                component.statistics["total_misses"] = '0'#str(int(component.statistics["BPredUnit.lookups"]) - int(component.statistics["BPredUnit.BTBHits"]))
+                component.statistics["total_accesses"] = 0#component.statistics["BPredUnit.lookups"]
+                component.statistics["total_hits"] = 0#component.statistics["BPredUnit.BTBHits"]
+                component.statistics["total_misses"] = 0#int(component.statistics["BPredUnit.lookups"]) - int(component.statistics["BPredUnit.BTBHits"])
 
         elif ptype == "DerivO3CPU":
-            component.statistics["fp_instructions"] = str(tryGrabComponentStat(component, "iq.FU_type_0::FloatAdd", conversion="int")  + \
+            component.statistics["fp_instructions"] = (tryGrabComponentStat(component, "iq.FU_type_0::FloatAdd", conversion="int")  + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::FloatCmp", conversion="int")  + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::FloatCvt", conversion="int")  + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::FloatMult", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::FloatDiv", conversion="int")  + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::FloatSqrt", conversion="int"))
-            component.statistics["int_instructions"] =  str(tryGrabComponentStat(component, "iq.FU_type_0::No_OpClass", conversion="int") + \
+            component.statistics["int_instructions"] =  (tryGrabComponentStat(component, "iq.FU_type_0::No_OpClass", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::IntAlu", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::IntMult", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::IntDiv", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::IprAccess", conversion="int"))
             try:
-                component.statistics["committed_int_instructions"] = str(int(float(component["int_instructions"])\
+                component.statistics["committed_int_instructions"] = int(float(component["int_instructions"])\
                                                             /(float(component["int_instructions"])+float(component["fp_instructions"]))\
-                                                            *int(component["commit:count"])))
-                component.statistics["committed_fp_instructions"] = str(int(float(component["fp_instructions"])\
+                                                            *int(component["commit:count"]))
+                component.statistics["committed_fp_instructions"] = int(float(component["fp_instructions"])\
                                                             /(float(component["int_instructions"])+float(component["fp_instructions"]))\
-                                                            *int(component["commit.count"])))
+                                                            *int(component["commit.count"]))
             except:
-                component.statistics["committed_int_instructions"] = "0"
-                component.statistics["committed_fp_instructions"] = "0"
-            component.statistics["load_instructions"] = str(tryGrabComponentStat(component, "iq.FU_type_0::MemRead", conversion="int") + \
+                component.statistics["committed_int_instructions"] = 0
+                component.statistics["committed_fp_instructions"] = 0
+            component.statistics["load_instructions"] = (tryGrabComponentStat(component, "iq.FU_type_0::MemRead", conversion="int") + \
                                                         tryGrabComponentStat(component, "iq.FU_type_0::InstPrefetch", conversion="int"))
-            component.statistics["store_instructions"] = str(tryGrabComponentStat(component, "iq.FU_type_0::MemWrite", conversion="int"))
-            component.statistics["num_busy_cycles"] = str(tryGrabComponentStat(component, "numCycles", conversion="int") - tryGrabComponentStat(component, "idleCycles", conversion="int"))
+            component.statistics["store_instructions"] = tryGrabComponentStat(component, "iq.FU_type_0::MemWrite", conversion="int")
+            component.statistics["num_busy_cycles"] = tryGrabComponentStat(component, "numCycles", conversion="int") - tryGrabComponentStat(component, "idleCycles", conversion="int")
 
         elif ptype == "Dir_config":
             cache = component.associated_cache # Set in generateCalcComponents
             try:
-                component.statistics["read_accesses"] = str(int(cache["directory_transactions::Shared_ReadMiss_1"]) + \
+                component.statistics["read_accesses"] = (int(cache["directory_transactions::Shared_ReadMiss_1"]) + \
                                                         int(cache["directory_transactions::Uncached_ReadMiss_3"]) + \
                                                         int(cache["directory_transactions::Modified_ReadMiss_5"]))
                                                         #component.statistics["directory_transactions::Internal_Shared_Fetch_11"] + \
                                                         #component.statistics["directory_transactions::Internal_Modified_Fetch_10"]
-                component.statistics["write_accesses"] = str(int(cache["directory_transactions::Shared_ReadExMiss_0"]) + \
+                component.statistics["write_accesses"] = (int(cache["directory_transactions::Shared_ReadExMiss_0"]) + \
                                                         int(cache["directory_transactions::Uncached_ReadExMiss_4"]) + \
                                                         int(cache["directory_transactions::Modified_ReadExMiss_6"]))
                                                         #component.statistics["directory_transactions::Shared_Invalidate_2"] + \
@@ -510,8 +532,8 @@ def generateCalcStats(options, cht, sht):
                                                         #component.statistics["directory_transactions::Internal_Shared_Invalidate_8"] + \
                                                         #component.statistics["directory_transactions::Internal_Modified_Invalidate_9"]
             except:
-                component.statistics["read_accesses"] = "0"
-                component.statistics["write_accesses"] = "0"
+                component.statistics["read_accesses"] = 0
+                component.statistics["write_accesses"] = 0
 
         # Calculate the stats for the memory controlle and the physical memory.
         # These components are tightly coupled, so we need to process them in
@@ -532,28 +554,28 @@ def generateCalcStats(options, cht, sht):
                 if s.has_key('num_writes::total'):
                     s['num_phys_mem_writes'] = s['num_writes::total']
 
-                comp.statistics["num_phys_mem_accesses"] = str(int(comp.statistics["num_phys_mem_reads"]) \
+                comp.statistics["num_phys_mem_accesses"] = (int(comp.statistics["num_phys_mem_reads"]) \
                                 + int(comp.statistics["num_phys_mem_writes"]))
             except:
-                comp.statistics["num_phys_mem_accesses"] = "0"
+                comp.statistics["num_phys_mem_accesses"] = 0
 
             # Now we can actually process the mc.
             if ptype == 'mc':
                 pmem = component.associated_pmem # Set in generateCalcComponents
                 try:
-                    component.statistics["num_phys_mem_accesses"] = str(int(pmem.statistics["num_phys_mem_accesses"]))
-                    component.statistics["num_phys_mem_reads"] = str(int(pmem.statistics["num_phys_mem_reads"]))
-                    component.statistics["num_phys_mem_writes"] = str(int(pmem.statistics["num_phys_mem_writes"]))
+                    component.statistics["num_phys_mem_accesses"] = int(pmem.statistics["num_phys_mem_accesses"])
+                    component.statistics["num_phys_mem_reads"] = int(pmem.statistics["num_phys_mem_reads"])
+                    component.statistics["num_phys_mem_writes"] = int(pmem.statistics["num_phys_mem_writes"])
                 except:
-                    component.statistics["num_phys_mem_accesses"] = "0"
-                    component.statistics["num_phys_mem_reads"] = "0"
-                    component.statistics["num_phys_mem_writes"] = "0"
+                    component.statistics["num_phys_mem_accesses"] = 0
+                    component.statistics["num_phys_mem_reads"] = 0
+                    component.statistics["num_phys_mem_writes"] = 0
 
     # add calculated statistics
     tick_key = "%s.sim_ticks"%(options.system_name)
     if tick_key in sht:
         fastest_clock = cht[options.system_name].params["fastest_clock"]
-        cht[options.system_name].statistics["total_cycles"] = str(int(sht[tick_key])/int(fastest_clock))
+        cht[options.system_name].statistics["total_cycles"] = int(sht[tick_key])/int(fastest_clock)
 
 
 '''
@@ -565,9 +587,9 @@ def genId(id_list):
 
 def tryGrabComponentStat(component, stat, conversion="int"):
     try:
-        value=str(component.statistics[stat])
+        value=component.statistics[stat]
     except:
-        value="0"
+        value=0
 
     if conversion=="int":
         value=int(value)
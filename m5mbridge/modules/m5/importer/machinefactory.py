@@ -1,7 +1,20 @@
 PARTREF = 'all.modules.m5.importer.machinefactory'
 
+import hashlib
+import os
+from os import path
+from cStringIO import StringIO
+
+# If possible use the faster C implementation of pickle.
+try:
+    import cPickle as pickle
+except:
+    import pickle
+
 from m5mbridge import bug, panic, warning, debug
+from m5mbridge.inputfile import openInput
 from configparser import M5ConfigParser
+from configjson import M5ConfigJsonParser, isJsonConfig
 from m5mbridge.machine import Machine
 from m5mbridge.machine.component import Component
 from m5mbridge.machine.visitor import Visitor
@@ -11,22 +24,122 @@ from translatorfactory import TranslatorFactory
 
 import sanitychecker
 
-def createFromConfigFile(config_file_path, options):
-    '''Like createFromConfig but reads the config from a file given as a path.'''
-
-    with open(config_file_path, 'r') as config_file:
-        return createFromConfig(config_file, options)
+# The in-process machine cache maps cache keys to pickled machines, see
+# createFromConfigFile(). It is bounded to avoid unlimited growth in
+# long-running processes that convert many different configurations.
+MACHINE_CACHE_SIZE = 16
+# Part of the cache key, changes whenever the pickled machines change.
+MACHINE_CACHE_VERSION = 2
+machineCache = {}
+machineCacheKeys = []
 
+def createFromConfigFile(config_file_path, options):
+    '''Like createFromConfig but reads the config from a file given as a path.
+
+    The created machines are cached, keyed by a hash of the config file and
+    the options that influence the machine model. Because a freshly created
+    machine has no stats yet, a cached machine is a template that is valid for
+    every stats file produced with the same config file. A cache hit returns
+    an independent copy of the template, so the caller only has to import the
+    stats. The cache is kept in-process and on-disk if --machine_cache_dir is
+    set. A config file ending in .json, e.g., config.json or config.json.gz,
+    is read as a config.json.
+    '''
 
-def createFromConfig(config_file, options):
+    with openInput(config_file_path) as config_file:
+        config = config_file.read()
+
+    key = machineCacheKey(config, options)
+    entry = loadCachedMachine(key, options)
+    if entry:
+        debug.pp(PARTREF, 'machine cache hit for {0}'.format(config_file_path))
+        return restoreMachine(entry, options)
+
+    debug.pp(PARTREF, 'machine cache miss for {0}'.format(config_file_path))
+    machine = createFromConfig(StringIO(config), options, isJsonConfig(config_file_path, config))
+    storeCachedMachine(key, machine, options)
+    return machine
+
+def machineCacheKey(config, options):
+    # Imported here, m5mbridge.machine.options indirectly imports this module.
+    from m5mbridge.machine.options import MACHINE_OPTIONS
+    h = hashlib.sha1(config)
+    h.update('\0version={0}'.format(MACHINE_CACHE_VERSION))
+    for name in MACHINE_OPTIONS:
+        h.update('\0{0}={1!r}'.format(name, getattr(options, name, None)))
+    return h.hexdigest()
+
+def machineCachePath(key, options):
+    cacheDir = getattr(options, 'machine_cache_dir', None)
+    if not cacheDir:
+        return None
+    return path.join(cacheDir, key + '.machine')
+
+def loadCachedMachine(key, options):
+    if key in machineCache:
+        return machineCache[key]
+
+    cachePath = machineCachePath(key, options)
+    if not cachePath or not path.exists(cachePath):
+        return None
+
+    with open(cachePath, 'rb') as f:
+        entry = f.read()
+    rememberMachine(key, entry)
+    return entry
+
+def storeCachedMachine(key, machine, options):
+    # The options are not part of the template, they are replaced on a cache
+    # hit. Note that the machine creation may change the cpu_name option (see
+    # handleSwitchCpus), so it is stored alongside the machine.
+    machineOptions = machine.options
+    machine.options = None
+    try:
+        entry = pickle.dumps((options.cpu_name, machine), -1)
+    finally:
+        machine.options = machineOptions
+    rememberMachine(key, entry)
+
+    cachePath = machineCachePath(key, options)
+    if not cachePath:
+        return
+    if not path.isdir(options.machine_cache_dir):
+        os.makedirs(options.machine_cache_dir)
+    # Concurrent conversions may share the cache directory, rename() makes
+    # sure that nobody reads a partially written template.
+    tmpPath = '{0}.{1}'.format(cachePath, os.getpid())
+    with open(tmpPath, 'wb') as f:
+        f.write(entry)
+    os.rename(tmpPath, cachePath)
+
+def rememberMachine(key, entry):
+    if key not in machineCache:
+        machineCacheKeys.append(key)
+        if len(machineCacheKeys) > MACHINE_CACHE_SIZE:
+            del machineCache[machineCacheKeys.pop(0)]
+    machineCache[key] = entry
+
+def restoreMachine(entry, options):
+    cpuName, machine = pickle.loads(entry)
+    options.cpu_name = cpuName
+    machine.options = options
+    machine.visit(lambda c: c.translator and setattr(c.translator, 'options', options))
+    return machine
+
+
+def createFromConfig(config_file, options, json=False):
     '''Create a machine object describing an M5 machine from a config.ini.
 
     This function returns a machine object containing a complete description of
-    the M5 machine. It reads the config file from an open file object.
+    the M5 machine. It reads the config file from an open file object. If
+    `json' is True the config file is a config.json.
     '''
 
     debug.pp(PARTREF, 'parsing config file')
-    parser = M5ConfigParser(config_file, options)
+    if json:
+        parser = M5ConfigJsonParser(config_file, options)
+    else:
+        parser = M5ConfigParser(config_file, options)
     cht = parser.run()
 
     debug.pp(PARTREF, 'creating machine')
@@ -37,44 +150,17 @@ def createFromConfig(config_file, options):
     return m
 
 def createComponentTree(machine):
-    '''Build component tree from config.ini children param.
+    '''Complete the component tree of a machine.
 
-    createComponentTree() does the following:
-    (1) creates a tree of components by looking at the config.ini
-    parameter children for each component.
+    The config parser already linked the components by their children
+    param, see configparser.py and configjson.py. createComponentTree() does the following:
+    (1) detects switch cpus.
     (2) stats are added to each component as appropriate.
     (3) missing stats are generated.
     (4) component translator is set
     (5) the translator grabs all relevant stats and params for
     the component and renames from M5 names to McPat names
     '''
-
-    debug.pp(PARTREF, 'creating component tree')
-
-    #create a component tree by looking at the children parameter
-    for c_key in machine.cht:
-        debug.pp(PARTREF, 'looking at {0}'.format(c_key))
-        component = machine.cht[c_key]
-        if component.params.has_key('children'):
-            for child in component.params['children'].split():
-                if c_key == "root":
-                    child_id = child
-                else:
-                    child_id = "%s.%s" %(component.id, child)
-
-                # For the x86 system Gem5 generates a broken config.ini, the
-                # terminal component is not a children of the system component.
-                # To fix the hierarchy, we just ignore it. The terminal is not
-                # important for the statistics.
-                if 'terminal' in child_id:
-                    debug.pp(PARTREF, 'skipping child {0}'.format(child_id))
-                    continue
-
-                if not machine.cht.has_key(child_id):
-                    panic("child_id %s does not exist." %(child_id),5)
-                debug.pp(PARTREF, 'appending child {0}'.format(child_id))
-                component.children.append(machine.cht[child_id])
-
     #detect and handle switch cpu configurations
     handleSwitchCpus(machine.options, machine.cht)
 
@@ -105,10 +191,13 @@ def hashComponents(machine):
     machine.visit(hasher)
 
 def translateComponents(machine):
-    machine.visit(lambda x: translateComponent(machine, x))
+    # The components of a translator class share the translator and the key
+    # tables of their translated params and stats.
+    translators = {}
+    machine.visit(lambda x: translateComponent(machine, x, translators))
 
-def translateComponent(machine, component):
-    component.translator = TranslatorFactory.create(machine.options, component)
+def translateComponent(machine, component, translators=None):
+    component.translator = TranslatorFactory.create(machine.options, component, translators)
     if component.translator:
         component.translator.translate(component)
         component.translator.translate_params(component)
@@ -0,0 +1,117 @@
+'''Parallel parsing of large stats files.
+
+Stats files of long full-system runs grow to gigabytes and the stats parser
+handles a single line at a time. With --parse_workers=N a stats file is split
+at line boundaries into chunks of at most CHUNK_SIZE bytes, which are parsed
+by a pool of N worker processes. Every worker memory-maps the stats file and
+returns the stats of its chunk. The stats of the chunks are merged in the
+order of the file, so that the value of a stat is the value of its last line
+in the file, like the single process parser does.
+
+A stats dict has only one entry per stat, no matter how many dumps a chunk
+holds, so little data is sent back from the workers. The workers also return
+the order in which the stats first appear, the merged stats dict is then the
+same as the one of M5StatsParser.run(), including the order of its keys.
+
+Only uncompressed regular files of at least MIN_PARALLEL_SIZE bytes are
+parsed in parallel. The worker processes of --jobs cannot start workers of
+their own and parse their stats files in a single process.
+
+The pool is only faster with an idle CPU core for every worker, the chunks
+are parsed as fast as by a single process and the stats of every chunk are
+sent back and merged in addition. Hence --parse_workers is 1 by default.
+test-parseworkers.py compares the parse times of a large synthetic stats
+file.
+'''
+
+PARTREF = 'all.modules.m5.importer.parallelparser'
+
+import mmap
+import multiprocessing
+import os
+from itertools import izip
+
+from m5mbridge import bug, panic, warning, debug
+from stats import M5StatsParser
+from statsfile import iterLines, isStatsFile
+
+CHUNK_SIZE = 64 << 20
+MIN_PARALLEL_SIZE = 2 * CHUNK_SIZE
+
+# The stats file and the parser of the chunks, inherited by the workers.
+chunkParser = None
+
+class OrderedStats(dict):
+    '''A stats dict that remembers the order in which the stats were added.'''
+    def __init__(self):
+        dict.__init__(self)
+        self.order = []
+
+    def __setitem__(self, key, value):
+        if not key in self:
+            self.order.append(key)
+        dict.__setitem__(self, key, value)
+
+def useParallelParser(stats_file_path, options):
+    '''Return the number of workers to parse the stats file at
+    `stats_file_path' with, or 0 if it is parsed by a single process.'''
+    workers = getattr(options, 'parse_workers', 1)
+    if workers <= 1 or multiprocessing.current_process().daemon:
+        return 0
+    if not isStatsFile(stats_file_path) or os.path.getsize(stats_file_path) < MIN_PARALLEL_SIZE:
+        return 0
+    return workers
+
+def splitChunks(data, size, chunkSize):
+    '''Return the (begin, end) offsets of chunks of complete lines of about
+    `chunkSize' bytes.'''
+    chunks = []
+    pos = 0
+    while pos < size:
+        end = data.find('\n', min(pos + chunkSize, size))
+        end = size if end < 0 else end + 1
+        chunks.append((pos, end))
+        pos = end
+    return chunks
+
+def parseChunk(chunk):
+    path, parser = chunkParser
+    begin, end = chunk
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            sht = OrderedStats()
+            parser.parseLines(iterLines(data, begin, end), sht)
+        finally:
+            data.close()
+    return sht.order, [sht[key] for key in sht.order]
+
+def parseStatsFileParallel(stats_file_path, options, whitelist, workers):
+    '''Parse the stats file at `stats_file_path' with a pool of `workers'
+    processes and return the stats dict of all dumps.'''
+    global chunkParser
+
+    size = os.path.getsize(stats_file_path)
+    # At least one chunk per worker, so that all of them get work.
+    chunkSize = min(CHUNK_SIZE, size // workers + 1)
+    with open(stats_file_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            chunks = splitChunks(data, size, chunkSize)
+        finally:
+            data.close()
+    debug.pp(PARTREF, 'parsing {0} in {1} chunks with {2} workers'.format(stats_file_path, len(chunks), workers))
+
+    chunkParser = (stats_file_path, M5StatsParser(None, options, whitelist))
+    pool = multiprocessing.Pool(min(workers, len(chunks)))
+    try:
+        sht = {}
+        # imap() returns the chunks in order, the stats of later chunks
+        # overwrite the ones of earlier chunks.
+        for keys, values in pool.imap(parseChunk, chunks, 1):
+            sht.update(izip(keys, values))
+    finally:
+        pool.close()
+        pool.join()
+        chunkParser = None
+    return sht
@@ -0,0 +1,108 @@
+'''Routing of stats to the components they belong to.
+
+A stat belongs to the component with the longest id that is a prefix of the
+stat's key, e.g., system.cpu0.numCycles belongs to system.cpu0 and is named
+numCycles there. Stats without a component belong to the root component.
+
+Probing the component hash table for every prefix of a key rebuilds a string
+per prefix. The StatRouter instead keeps the ids of the components in a trie
+of their dot-separated segments, e.g., system -> cpu0 -> icache, and finds the
+longest matching id by a single walk over the segments of the key. The name
+of the stat is the rest of the key, no strings are joined.
+
+gem5 dumps the same stats every time, so the router also caches the route of
+every key it resolved. From the second dump on every stat is routed by a
+single dict lookup in StatRouter.routes. The hits and misses of the cache are
+counted, see summary().
+
+The router of a machine is built from machine.cht by statRouter() and stored
+in the machine. It is rebuilt, and its cache dropped, only if the ids of the
+components change.
+'''
+
+PARTREF = 'all.modules.m5.importer.statrouter'
+
+from m5mbridge import bug, panic, warning, debug
+
+class StatRouter(object):
+    def __init__(self, cht):
+        self.componentIds = frozenset(cht)
+        # A node of the trie is a pair of a dict mapping segments to child
+        # nodes and the id of the component that ends at the node or None.
+        self.root = ({}, None)
+        for componentId in cht:
+            self.add(componentId)
+        # Maps stat keys to (component id, stat name).
+        self.routes = {}
+        self.hits = 0
+        self.misses = 0
+        self.debug('routing stats to {0} components'.format(len(cht)))
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def isStale(self, cht):
+        '''Return True if the components of `cht' are not the ones the
+        router was built for.'''
+        return len(cht) != len(self.componentIds) or frozenset(cht) != self.componentIds
+
+    def add(self, componentId):
+        children = self.root[0]
+        segments = componentId.split('.')
+        for segment in segments[:-1]:
+            children = children.setdefault(segment, ({}, None))[0]
+        last = segments[-1]
+        node = children.get(last)
+        children[last] = (node and node[0] or {}, componentId)
+
+    def route(self, key):
+        '''Return the id of the component the stat `key' belongs to and the
+        name of the stat relative to that component.'''
+        route = self.routes.get(key)
+        if route is None:
+            return self.resolve(key)
+        self.hits += 1
+        return route
+
+    def resolve(self, key):
+        '''Like route() but walks the trie and caches the route. Callers
+        that look up self.routes themselves call this on a miss.'''
+        self.misses += 1
+        children = self.root[0]
+        componentId = None
+        for segment in key.split('.'):
+            node = children.get(segment)
+            if node is None:
+                break
+            children, nodeId = node
+            if nodeId is not None:
+                componentId = nodeId
+
+        if componentId is None:
+            if not '.' in key:
+                panic("error: parsed invalid stat.", 6)
+            route = self.routes[key] = ('root', key)
+            return route
+        if len(componentId) == len(key):
+            # The key is the id of a component.
+            panic("error: parsed invalid stat.", 6)
+        # The id of the component is a prefix of the key. The names are
+        # interned, components of the same type have stats of the same names.
+        route = self.routes[key] = (componentId, intern(key[len(componentId)+1:]))
+        return route
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        ratio = lookups and float(self.hits) / lookups or 0.0
+        return 'route cache: {0} hits, {1} misses, {2:.1%} hit ratio'.format(self.hits, self.misses, ratio)
+
+def statRouter(machine):
+    '''Return the StatRouter of a machine, building it on first use and
+    whenever the components of the machine changed.'''
+    # Machines cached by older versions have no router attribute.
+    router = getattr(machine, 'statRouter', None)
+    if router is None or router.isStale(machine.cht):
+        if router:
+            debug.pp(PARTREF, 'components changed, dropping the route cache')
+        router = machine.statRouter = StatRouter(machine.cht)
+    return router
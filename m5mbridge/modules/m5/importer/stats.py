@@ -6,32 +6,187 @@ from m5mbridge import bug, panic, warning, debug
 import re
 from generatecalcparts import generateCalcStats
 from generatecalcparts import genId
+from statsfilter import statsWhitelist
+from statspruner import pruneStats
+from statsfile import BEGIN_DUMP_MARKER, StatsFile, isStatsFile
+from statsdelta import StatsDelta
+from statrouter import statRouter, PARTREF as STATROUTER_PARTREF
+from contextlib import closing
+from m5mbridge.machine.statvalue import parseStatValue
+from m5mbridge.inputfile import openInput
 
 def importStatsFromFile(stats_file_path, machine):
-    '''Like importStats but reads from a file given as a path.'''
-    with open(stats_file_path, 'r') as stats_file:
+    '''Like importStats but reads from a file given as a path. Compressed
+    files and - for stdin are supported, see openInput(), and so are stats
+    archives, see statsarchive.py. Large stats files are parsed by several
+    processes with --parse_workers, see parallelparser.py.'''
+    from statsarchive import StatsArchive, isStatsArchive
+    from parallelparser import parseStatsFileParallel, useParallelParser
+    if isStatsArchive(stats_file_path):
+        with closing(StatsArchive(stats_file_path)) as archive:
+            importStats(archive, machine)
+        return
+    workers = useParallelParser(stats_file_path, machine.options)
+    if workers:
+        sht = parseStatsFileParallel(stats_file_path, machine.options, statsWhitelist(machine), workers)
+        debug.pp(PARTREF, 'importing stats')
+        importer = M5StatsImporter(machine, sht)
+        importer.run()
+        return
+    with openInput(stats_file_path) as stats_file:
         importStats(stats_file, machine)
 
-def importStats(stats_file, machine):
+def importStats(stats_file, machine, delta=None):
     '''Convenience function to simplify stats importing.
 
     This function uses the M5StatsParser class to read the stats.txt file
     generated by M5 and adds the stats data to the machine's component tree
     using the M5StatsImporter class.
 
-    stats_file must be an open file object.'''
+    stats_file must be an open file object or a StatsArchive. If a
+    StatsDelta `delta' is given, the counters are imported as the difference
+    to the stats of the previous call.'''
 
-    debug.pp(PARTREF, 'parsing stats')
-    parser = M5StatsParser(stats_file, machine.options)
-    sht = parser.run()
+    from statsarchive import StatsArchive
+    whitelist = statsWhitelist(machine)
+    if isinstance(stats_file, StatsArchive):
+        debug.pp(PARTREF, 'reading stats archive')
+        sht = stats_file.mergedStats(stats_file.selectColumns(whitelist))
+    else:
+        debug.pp(PARTREF, 'parsing stats')
+        parser = M5StatsParser(stats_file, machine.options, whitelist)
+        sht = parser.run()
+    if delta:
+        delta.apply(sht)
     debug.pp(PARTREF, 'importing stats')
     importer = M5StatsImporter(machine, sht)
     importer.run()
 
+def importStatsDumpsFromFile(stats_file_path, machine, numbers=None):
+    '''Like importStatsDumps but reads from a file given as a path.
+
+    The dumps are numbered from zero in the order of the stats file, dumps
+    without any stat line are not counted. The numbers are the same for a
+    stats file, its compressed copy and its stats archive.
+
+    Regular files are memory-mapped and only the dumps in `numbers' are
+    imported, all dumps if it is None. The dumps are located via the index of
+    StatsFile, the other dumps are never read. The same holds for stats
+    archives. Other files, e.g., compressed files or stdin, are read as a
+    stream.'''
+    for n, sht in parseStatsDumpsFromFile(stats_file_path, machine, numbers):
+        debug.pp(PARTREF, 'importing stats dump {0}'.format(n))
+        importer = M5StatsImporter(machine, sht)
+        importer.run()
+        yield n
+
+def parseStatsDumpsFromFile(stats_file_path, machine, numbers=None):
+    '''Parse the stats dumps of a stats file given as a path, yielding the
+    number and the stats dict of every dump. See importStatsDumpsFromFile.
+
+    With --delta_stats the counters of every dump are replaced by the
+    difference to the previous dump (see StatsDelta). If only some dumps are
+    selected, the dump before a selected dump is parsed as well.'''
+    from statsarchive import StatsArchive, isStatsArchive
+    whitelist = statsWhitelist(machine)
+    delta = getattr(machine.options, 'delta_stats', False) and StatsDelta() or None
+    if isStatsArchive(stats_file_path):
+        with closing(StatsArchive(stats_file_path)) as archive:
+            columns = archive.selectColumns(whitelist)
+            for n, sht in selectStatsDumps(stats_file_path, len(archive), numbers, lambda n: archive.stats(n, columns), delta):
+                yield n, sht
+        return
+
+    if not isStatsFile(stats_file_path):
+        if numbers is not None:
+            panic("cannot select stats dumps of {0}, it is not an uncompressed regular file.".format(stats_file_path), 8)
+        with openInput(stats_file_path) as stats_file:
+            parser = M5StatsParser(stats_file, machine.options, whitelist)
+            for n, sht in enumerate(parser.dumps()):
+                if delta:
+                    delta.apply(sht)
+                yield n, sht
+        return
+
+    with closing(StatsFile(stats_file_path, getattr(machine.options, 'dump_index_dir', None))) as statsFile:
+        parser = M5StatsParser(None, machine.options, whitelist)
+        def parseDump(n):
+            sht = {}
+            parser.parseLines(statsFile.dumpLines(n), sht)
+            return sht
+        for n, sht in selectStatsDumps(stats_file_path, len(statsFile), numbers, parseDump, delta):
+            yield n, sht
+
+def selectStatsDumps(stats_file_path, count, numbers, readDump, delta):
+    '''Read the dumps in `numbers' of the `count' dumps of a stats file by
+    calling readDump(n), yielding the number and the stats dict of every
+    dump. See parseStatsDumpsFromFile.'''
+    if numbers is None:
+        numbers = xrange(count)
+    last = None
+    for n in numbers:
+        if not -count <= n < count:
+            panic("stats file {0} has {1} dumps, there is no dump {2}.".format(stats_file_path, count, n), 8)
+        n = n % count
+        if delta and last != n-1:
+            # Start over from the dump before, the first dump has
+            # nothing to subtract.
+            delta.reset()
+            if n > 0:
+                delta.apply(readDump(n-1))
+        last = n
+        sht = readDump(n)
+        if delta:
+            delta.apply(sht)
+        yield n, sht
+
+def importStatsDumpFromFile(stats_file_path, machine, n):
+    '''Import only stats dump `n' of a stats file given as a path. Negative
+    numbers count from the end, e.g., -1 is the last dump.'''
+    for n in importStatsDumpsFromFile(stats_file_path, machine, [n]):
+        pass
+
+def importStatsDumps(stats_file, machine):
+    '''Import the stats dumps of a stats file one after another.
+
+    Unlike importStats, which merges all dumps of the stats file, this
+    generator reads the stats file dump by dump. After each dump is imported
+    into the machine it yields the number of the dump, starting at zero. The
+    caller can then export the machine before the next dump replaces its
+    stats.
+
+    stats_file must be an open file object.'''
+
+    parser = M5StatsParser(stats_file, machine.options, statsWhitelist(machine))
+    for n, sht in enumerate(parser.dumps()):
+        debug.pp(PARTREF, 'importing stats dump {0}'.format(n))
+        importer = M5StatsImporter(machine, sht)
+        importer.run()
+        yield n
+
+# A stats line starts with the name of the stat followed by whitespace, its
+# value and more whitespace, e.g., "system.cpu.numCycles   1234   # desc". The
+# character class of the name includes the range A-z on purpose, it is the
+# same class the parser always used.
+STAT_LINE_RE = re.compile(r"([\.0-9a-zA-z_:]*)\s+([\w\.]+)\s")
+
 class M5StatsParser(object):
-    def __init__(self, stats_file, options):
+    '''Parses a stats file into a dict of stats.
+
+    If a `whitelist' is given (see statsfilter.py), stats that are not in
+    the whitelist are dropped. The keys are interned, every dump repeats the
+    same keys.
+    '''
+    def __init__(self, stats_file, options, whitelist=None):
         self.stats_file = stats_file
         self.options = options
+        self.whitelist = whitelist
+        self.decisions = {}
+        self.systemPrefix = options.system_name
+        self.systemDot = options.system_name + '.'
+        # True if the lines of the last parseLines() had a stat line, even if
+        # the whitelist dropped all stats.
+        self.sawStats = False
 
     def debug(self, *args):
         debug.pp(PARTREF, *args)
@@ -39,40 +194,111 @@ class M5StatsParser(object):
     def run(self):
         sht = {}
         #add all the statistics to the dictionary
-        for line in self.stats_file:
-            #print line
-            match = re.match("(%s[\.0-9a-zA-z_:]*)\s+([\w\.]+)\s+"%(self.options.system_name), line)
-            if match:
-                self.debug('sht[{0}] = {1} (1st try)'.format(match.group(1), match.group(2)))
-                sht[match.group(1)] = match.group(2)
-                continue
+        self.parseLines(self.stats_file, sht)
+        return sht
 
-            #match = re.match(r"(client[\.0-9a-zA-z_:]*)\s+([\w\.]+)\s+", line)
-            #if match:
-            #    #sht[match.group(1)] = match.group(2)
-            #    continue
-            #
-            #match = re.match(r"(server[\.0-9a-zA-z_:]*)\s+([\w\.]+)\s+", line)
-            #if match:
-            #    #sht[match.group(1)] = match.group(2)
-            #    continue
-
-            match = re.match(r"(global[\.0-9a-zA-z_:]*)\s+([\w\.]+)\s+", line)
-            if  match:
-                self.debug('sht[{0}] = {1} (2nd try)'.format(match.group(1), match.group(2)))
-                sht[match.group(1)] = match.group(2)
-                continue
+    def dumps(self):
+        '''Iterate over the stats dumps, returning one stats dict per dump.
 
-            match = re.match(r"([\.0-9a-zA-z_:]*)\s+([\w\.]+)\s+", line)
-            if  match:
-                self.debug('sht[{0}] = {1} (3rd try)'.format(match.group(1), match.group(2)))
-                sht["%s."%(self.options.system_name)+match.group(1)] = match.group(2)
-                #sht[match.group(1)] = match.group(2)
-                continue
+        The stats file is read lazily, only the stats of the current dump are
+        kept in memory. Dumps without any stat line are skipped, see
+        statsfile.py, a dump whose stats are all dropped by the whitelist is
+        returned as empty stats dict.
+        '''
+        lines = iter(self.stats_file)
+        while True:
+            sht = {}
+            more = self.parseLines(lines, sht, stopAtDump=True)
+            if self.sawStats:
+                yield sht
+            if not more:
+                return
 
-        return sht
+    def parseLines(self, lines, sht, stopAtDump=False):
+        '''Add the stats of all lines to sht.
+
+        With `stopAtDump' parsing stops after the first line that begins a
+        new stats dump and True is returned. Otherwise it returns False once
+        all lines are parsed.
+
+        This is parseLine() inlined, it is by far the hottest loop of the
+        conversion.
+        '''
+        self.sawStats = False
+        if debug.enabled(PARTREF):
+            for line in lines:
+                if stopAtDump and BEGIN_DUMP_MARKER in line:
+                    return True
+                if STAT_LINE_RE.match(line):
+                    self.sawStats = True
+                self.parseLine(sht, line)
+            return False
+
+        match = STAT_LINE_RE.match
+        systemPrefix = self.systemPrefix
+        systemDot = self.systemDot
+        whitelist = self.whitelist
+        decisions = self.decisions
+        seen = False
+        for line in lines:
+            m = match(line)
+            if m:
+                seen = True
+                key, value = m.groups()
+                if not (key.startswith(systemPrefix) or key.startswith('global')):
+                    key = systemDot + key
+                if whitelist is None:
+                    sht[intern(key)] = parseStatValue(value)
+                    continue
+                # Every dump repeats the same keys, remember the whitelist
+                # lookups and the interned keys.
+                keep = decisions.get(key)
+                if keep is None:
+                    keep = decisions[key] = key in whitelist and intern(key)
+                if keep:
+                    sht[keep] = parseStatValue(value)
+            elif stopAtDump and BEGIN_DUMP_MARKER in line:
+                self.sawStats = seen
+                return True
+        self.sawStats = seen
+        return False
+
+    def parseLine(self, sht, line):
+        '''Add the stat of a line of the stats file to sht.
+
+        A single precompiled pattern matches all stat lines. The name of the
+        stat is then classified: names of stats of the system, e.g.,
+        system.cpu.numCycles, and global stats, e.g., global.BPredUnit.lookups,
+        are used as they are, all other names, e.g., sim_seconds, are prefixed
+        with the system name. The value is stored as a number, see
+        statvalue.py.
+        '''
+        m = STAT_LINE_RE.match(line)
+        if not m:
+            return
+        key, value = m.groups()
+        if not (key.startswith(self.systemPrefix) or key.startswith('global')):
+            key = self.systemDot + key
+        if self.whitelist is not None and key not in self.whitelist:
+            return
+        key = intern(key)
+        value = parseStatValue(value)
+        if debug.enabled(PARTREF):
+            self.debug('sht[{0}] = {1}'.format(key, value))
+        sht[key] = value
 
 class M5StatsImporter(object):
+    '''Imports a stats dict into the component tree of a machine.
+
+    The first import clears the stats of all components and adds the new
+    stats. Later imports of a dict with the same keys, e.g., of the next dump
+    of the same run, update the stats in place instead. Only the components
+    that had a stat change, or that calculate stats from such a component
+    (see calcDependents()), get their calculated stats and translations
+    recomputed. The ids of these components are stored in
+    machine.dirtyComponents for the exporters, it is None after a full
+    import.
+    '''
     def __init__(self, machine, sht):
         self.machine = machine
         self.cht = machine.cht
@@ -84,36 +310,37 @@ class M5StatsImporter(object):
         debug.pp(PARTREF, *args)
 
     def run(self):
+        # A changed component tree has a new router, the stats are imported
+        # from scratch then.
+        previousRouter = getattr(self.machine, 'statRouter', None)
+        router = statRouter(self.machine)
+        keys = getattr(self.machine, 'importedStatKeys', None)
+        if router is previousRouter and keys is not None and self.sht.viewkeys() == keys:
+            self.update(router)
+        else:
+            self.replace(router)
+            if getattr(self.options, 'prune_stats', False):
+                self.machine.statsPruneReport = pruneStats(self.machine, self.sht, router)
+        if debug.enabled(STATROUTER_PARTREF):
+            router.debug(router.summary())
 
+    def replace(self, router):
         self.debug('clearing component stats')
         clearComponentStats(self.machine)
 
         #add all statistics to right component
-        for stat_key in self.sht:
-            #find the longest prefix that matches a component id
-            stat = self.sht[stat_key]
-            temp = stat_key.split('.')
-            num_fields = len(temp)
-            prefix_id = None
-
-            for x in xrange(num_fields, 0, -1):
-                prefix_id = genId(temp[0:x])
-                if self.cht.has_key(prefix_id):
-                    break
-
-            #add the statistic to the right component
-            stat_id = genId(temp[x:num_fields])
-            if len(stat_id) < 1:
-                panic("error: parsed invalid stat.",6)
-
-            #for all those stats that don't have a component, add it to root component
-            if not self.cht.has_key(prefix_id):
-                prefix_id="root"
-                stat_id = genId(temp)
-
-            self.debug('{0}.stats[{1}] = {2}'.format(prefix_id, stat_id, stat))
-            component = self.cht[prefix_id]
-            component.statistics[stat_id] = stat
+        routes = router.routes
+        misses = router.misses
+        debugging = debug.enabled(PARTREF)
+        cht = self.cht
+        for stat_key, stat in self.sht.iteritems():
+            # The keys are the same every dump, see StatRouter.
+            route = routes.get(stat_key) or router.resolve(stat_key)
+            prefix_id, stat_id = route
+            if debugging:
+                self.debug('{0}.stats[{1}] = {2}'.format(prefix_id, stat_id, stat))
+            cht[prefix_id].statistics[stat_id] = stat
+        router.hits += len(self.sht) - (router.misses - misses)
 
         # generate calculated statistics
         self.debug('generating calculated stats')
@@ -124,6 +351,62 @@ class M5StatsImporter(object):
         self.debug('translating statistics')
         self.machine.visit(lambda x: x.translator and x.translator.translate_statistics(x))
 
+        self.machine.importedStatKeys = set(self.sht)
+        self.machine.calcDependents = calcDependents(self.cht)
+        self.machine.dirtyComponents = None
+        self.machine.statsPruneReport = None
+
+    def update(self, router):
+        routes = router.routes
+        debugging = debug.enabled(PARTREF)
+        cht = self.cht
+        dirty = set()
+        for stat_key, stat in self.sht.iteritems():
+            # All keys were routed by the previous import, except for the
+            # keys of pruned stats, see statspruner.py.
+            route = routes.get(stat_key)
+            if route is None:
+                continue
+            prefix_id, stat_id = route
+            statistics = cht[prefix_id].statistics
+            old = statistics.get(stat_id)
+            # 1 == 1.0, but they are written differently.
+            if old != stat or old.__class__ is not stat.__class__:
+                if debugging:
+                    self.debug('{0}.stats[{1}] = {2}'.format(prefix_id, stat_id, stat))
+                statistics[stat_id] = stat
+                dirty.add(prefix_id)
+        router.hits += len(self.sht)
+
+        # Components calculating stats from changed components must be
+        # recomputed as well.
+        dependents = self.machine.calcDependents
+        for componentId in list(dirty):
+            dirty.update(dependents.get(componentId, ()))
+        self.debug('updating {0} of {1} components'.format(len(dirty), len(cht)))
+
+        generateCalcStats(self.options, self.cht, self.sht, dirty)
+
+        for componentId in dirty:
+            component = cht[componentId]
+            component.translated_statistics.clear()
+            if component.translator:
+                component.translator.translate_statistics(component)
+
+        self.machine.dirtyComponents = dirty
+
+def calcDependents(cht):
+    '''Return a dict mapping component ids to the ids of the components
+    whose calculated stats read the stats of that component, see the
+    associated_* attributes set in generateCalcComponents().'''
+    dependents = {}
+    for component in cht.itervalues():
+        for name in ('associated_cpu', 'associated_cache', 'associated_pmem'):
+            other = getattr(component, name, None)
+            if other is not None:
+                dependents.setdefault(other.id, []).append(component.id)
+    return dependents
+
 def clearComponentStats(machine):
     '''Resets all access statistics of every component.'''
     machine.visit(clearComponentStat)
@@ -131,4 +414,3 @@ def clearComponentStats(machine):
 def clearComponentStat(component):
     component.statistics.clear()
     component.translated_statistics.clear()
-    del component.translated_statistics_order[:]
@@ -0,0 +1,240 @@
+'''A binary archive of the stats of all dumps of a stats file.
+
+Parsing a stats file is the slowest part of a conversion, and the same stats
+files are often mined again and again for different studies. A stats archive
+holds the parsed stats of all dumps, so that the stats can be read again
+without parsing any text:
+
+  - the key table, the keys of all stats in the order of the stats file,
+    e.g., system.cpu0.numCycles,
+  - the dump index, the number of every dump in the stats file and the byte
+    offsets of its text if the stats file is a regular file,
+  - the values, one column of 64 bit floats per key with one value per dump.
+
+The archive starts with MAGIC and the length of the header, which holds the
+key table, the dump index and the layout of the values as JSON. The header is
+not pickled, so that reading an archive never executes code. The values
+follow the header as a keys x dumps array and are memory-mapped by NumPy, so
+that only the values that are read are loaded. The values of a stat over a
+range of dumps are stored next to each other, see StatsArchive.query().
+
+Stats that are integers in all dumps are converted back to ints when a dump
+is read, i.e., ints above 2**53 lose precision. Stats missing in a dump are
+NaN in query() and left out of the stats dict of the dump. Values that are
+not numbers are not archived.
+
+A stats archive can be used wherever a stats file is read, e.g.,
+-s stats.m5a, it is recognized by MAGIC. NumPy is required to write and to
+read stats archives.
+'''
+
+PARTREF = 'all.modules.m5.importer.statsarchive'
+
+import json
+import os
+import struct
+from collections import OrderedDict
+
+from m5mbridge import bug, panic, warning, debug
+from stats import M5StatsParser
+from statsfile import StatsFile, isStatsFile
+from statsmatrix import importNumpy
+from m5mbridge.inputfile import openInput
+
+MAGIC = 'M5STATSARCHIVE\n'
+VERSION = 2
+# The header length follows MAGIC as unsigned 64 bit little endian integer.
+HEADER_LENGTH = struct.Struct('<Q')
+DTYPE = '<f8'
+
+def isStatsArchive(path):
+    '''Return True if the file at `path' is a stats archive.'''
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except IOError:
+        return False
+
+class StatsArchive(object):
+    def __init__(self, path):
+        numpy = importNumpy()
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                panic("{0} is not a stats archive.".format(path), 8)
+            (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            try:
+                header = json.loads(f.read(length))
+            except ValueError:
+                panic("stats archive {0} has an invalid header, archives of version 1 must be written again.".format(path), 8)
+        if not isinstance(header, dict) or header.get('version') != VERSION:
+            panic("stats archive {0} has version {1}, expected version {2}.".format(path, isinstance(header, dict) and header.get('version'), VERSION), 8)
+
+        # The keys are interned, so that the stats dicts of all dumps share
+        # the same key strings.
+        self.columns = [intern(key.encode('utf-8')) for key in header['columns']]
+        self.columnIndex = dict((key, col) for col, key in enumerate(self.columns))
+        self.integer = header['integer']
+        self.dumps = header['dumps']
+        self.offsets = [offset and tuple(offset) for offset in header['offsets']]
+        # Maps dumps to the columns that have no value in that dump.
+        self.missing = {}
+        for col, row in header['missing']:
+            self.missing.setdefault(row, set()).add(col)
+
+        shape = (len(self.columns), len(self.dumps))
+        if shape[0] and shape[1]:
+            self.data = numpy.memmap(path, dtype=DTYPE, mode='r', offset=header['dataOffset'], shape=shape)
+        else:
+            # mmap refuses to map nothing.
+            self.data = numpy.zeros(shape)
+        debug.pp(PARTREF, '{0}: {1} stats x {2} dumps'.format(path, *shape))
+
+    def close(self):
+        self.data = None
+
+    def __len__(self):
+        return len(self.dumps)
+
+    def stat(self, key, start=0, stop=None):
+        '''Return the values of the stat `key' of the dumps start to stop-1
+        as NumPy array, or None if there is no such stat.'''
+        col = self.columnIndex.get(key)
+        if col is None:
+            return None
+        return self.data[col, start:stop]
+
+    def query(self, componentId, statName, start=0, stop=None):
+        '''Return the values of the stat `statName' of the component
+        `componentId', e.g., system.cpu0 and numCycles, of the dumps start to
+        stop-1 as NumPy array, or None if there is no such stat.'''
+        return self.stat('{0}.{1}'.format(componentId, statName), start, stop)
+
+    def selectColumns(self, whitelist):
+        '''Return the columns of the stats kept by `whitelist' (see
+        statsfilter.py), or None for all columns if it is None.'''
+        if whitelist is None:
+            return None
+        return [col for col, key in enumerate(self.columns) if key in whitelist]
+
+    def stats(self, row, columns=None):
+        '''Return the stats dict of dump `row' like the stats parser does.
+        If `columns' is given, only the stats of these columns are
+        returned.'''
+        sht = {}
+        self.addStats(sht, row, columns)
+        return sht
+
+    def addStats(self, sht, row, columns=None):
+        values = self.data[:, row].tolist()
+        keys = self.columns
+        integer = self.integer
+        missing = self.missing.get(row, ())
+        if columns is None:
+            columns = xrange(len(keys))
+        for col in columns:
+            if col in missing:
+                continue
+            value = values[col]
+            sht[keys[col]] = int(value) if integer[col] else value
+
+    def mergedStats(self, columns=None):
+        '''Return the stats of all dumps merged into one stats dict, like
+        importStats() merges the dumps of a stats file: the value of a stat
+        is its value of the last dump that has the stat.'''
+        sht = {}
+        for row in xrange(len(self.dumps)):
+            self.addStats(sht, row, columns)
+        return sht
+
+def writeStatsArchiveFromFile(stats_file_path, archive_path, options):
+    '''Parse all dumps of a stats file given as a path and write them as
+    stats archive to `archive_path'. All stats are archived, the whitelist
+    of the stats read by a machine is applied when the archive is read.'''
+    numpy = importNumpy()
+
+    rows = []
+    dumps = []
+    offsets = []
+    # The stats dicts are ordered to keep the order of the stats file, see
+    # below.
+    if isStatsFile(stats_file_path):
+        parser = M5StatsParser(None, options, None)
+        with StatsFile(stats_file_path, getattr(options, 'dump_index_dir', None)) as statsFile:
+            for n in xrange(len(statsFile)):
+                sht = OrderedDict()
+                parser.parseLines(statsFile.dumpLines(n), sht)
+                if sht:
+                    rows.append(sht)
+                    dumps.append(n)
+                    offsets.append(statsFile.index[n])
+    else:
+        with openInput(stats_file_path) as stats_file:
+            parser = M5StatsParser(stats_file, options, None)
+            lines = iter(stats_file)
+            more = True
+            while more:
+                sht = OrderedDict()
+                more = parser.parseLines(lines, sht, stopAtDump=True)
+                if sht:
+                    rows.append(sht)
+                    dumps.append(len(dumps))
+                    offsets.append(None)
+
+    # The order of the stats file is kept, so that the stats dicts read from
+    # the archive are the same as the ones of the stats parser, including the
+    # order of their keys. The stats are written in this order, e.g., to
+    # summary.xml.
+    columns = []
+    columnIndex = {}
+    for sht in rows:
+        for key in sht:
+            if not key in columnIndex:
+                columnIndex[key] = len(columns)
+                columns.append(key)
+
+    data = numpy.empty((len(columns), len(rows)), dtype=DTYPE)
+    data.fill(numpy.nan)
+    integer = [True] * len(columns)
+    present = numpy.zeros(data.shape, dtype=bool)
+    for row, sht in enumerate(rows):
+        for key, value in sht.iteritems():
+            col = columnIndex[key]
+            if isinstance(value, basestring):
+                continue
+            if not isinstance(value, (int, long)):
+                integer[col] = False
+            data[col, row] = value
+            present[col, row] = True
+    missing = zip(*numpy.nonzero(~present))
+    missing = [(int(col), int(row)) for col, row in missing]
+
+    header = {
+        'version': VERSION,
+        'columns': columns,
+        'integer': integer,
+        'dumps': dumps,
+        'offsets': offsets,
+        'missing': missing,
+    }
+    # The data offset is part of the header, so the header is encoded until
+    # its length is stable. The values are aligned to 8 bytes.
+    header['dataOffset'] = 0
+    while True:
+        encoded = json.dumps(header, separators=(',', ':'))
+        dataOffset = len(MAGIC) + HEADER_LENGTH.size + len(encoded)
+        dataOffset += -dataOffset % 8
+        if dataOffset == header['dataOffset']:
+            break
+        header['dataOffset'] = dataOffset
+
+    # Readers must never see a partially written archive.
+    tmpPath = '{0}.{1}'.format(archive_path, os.getpid())
+    with open(tmpPath, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        f.write('\0' * (dataOffset - f.tell()))
+        data.tofile(f)
+    os.rename(tmpPath, archive_path)
+    debug.pp(PARTREF, '{0}: {1} stats x {2} dumps'.format(archive_path, *data.shape))
@@ -0,0 +1,90 @@
+'''Interval stats from cumulative stats dumps.
+
+Unless gem5 resets the stats after every dump, the stats of a dump are
+cumulative, i.e., they count everything since the start of the simulation,
+and McPat would compute the average power of the whole run so far instead of
+the power of the last interval. The StatsDelta stage sits between the stats
+parser and the stats importer and turns the counters of each stats dict into
+the difference to the previous dump. Gauges, e.g., averages and rates, are
+passed through as they are.
+
+A stat is classified by the first rule of DELTA_RULES whose shell-style
+pattern matches its key. Stats without a matching rule are counters if their
+value is an int and gauges otherwise, because gem5 computes averages, rates
+and ratios as floats. The class of every key is cached, so after the first
+dump each dump costs one dict lookup per stat. The stats dict is updated in
+place and only the previous values of the counters are kept.
+
+If a counter decreases, e.g., because the stats were reset between two dumps,
+its value already is the interval value and is passed through.
+'''
+
+PARTREF = 'all.modules.m5.importer.statsdelta'
+
+import fnmatch
+import re
+
+from m5mbridge import bug, panic, warning, debug
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+
+DELTA_RULES = [
+    # The interval, McPat uses the simulated time to compute the power.
+    ('*.sim_seconds', COUNTER),
+    ('*.sim_ticks', COUNTER),
+    ('*.sim_insts', COUNTER),
+    ('*.host_seconds', COUNTER),
+    ('*.sim_freq', GAUGE),
+    ('*.host_*', GAUGE),
+    # Statistics of distributions.
+    ('*::mean', GAUGE),
+    ('*::stdev', GAUGE),
+    ('*::samples', COUNTER),
+    # Formulas.
+    ('*avg*', GAUGE),
+    ('*rate*', GAUGE),
+    ('*ratio*', GAUGE),
+    ('*.ipc*', GAUGE),
+    ('*.cpi*', GAUGE),
+]
+
+class StatsDelta(object):
+    def __init__(self, rules=DELTA_RULES):
+        self.rules = [(re.compile(fnmatch.translate(pattern)), kind) for (pattern, kind) in rules]
+        # Maps keys to True for counters and False for gauges.
+        self.isCounter = {}
+        # The cumulative values of the counters of the previous dump.
+        self.previous = {}
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def classify(self, key, value):
+        for (pattern, kind) in self.rules:
+            if pattern.match(key):
+                break
+        else:
+            kind = isinstance(value, (int, long)) and COUNTER or GAUGE
+        self.debug('{0} is a {1}'.format(key, kind))
+        return kind == COUNTER
+
+    def apply(self, sht):
+        '''Replace the counters of the stats dict `sht' by their difference
+        to the previous call.'''
+        isCounter = self.isCounter
+        previous = self.previous
+        for key, value in sht.iteritems():
+            counter = isCounter.get(key)
+            if counter is None:
+                counter = isCounter[key] = self.classify(key, value)
+            if not counter or isinstance(value, basestring):
+                continue
+            last = previous.get(key, 0)
+            previous[key] = value
+            if value >= last:
+                sht[key] = value - last
+
+    def reset(self):
+        '''Forget the previous dump, the next dump is passed through.'''
+        self.previous.clear()
@@ -0,0 +1,176 @@
+'''Random access to the stats dumps of a stats file.
+
+gem5 appends a stats dump to the stats file whenever stats are dumped. A
+stats dump starts with a "Begin Simulation Statistics" line and ends with an
+"End Simulation Statistics" line. The StatsFile class memory-maps a stats
+file and indexes the byte offsets of its dumps, so that consumers can iterate
+over the dumps or jump straight to dump N without reading the whole file into
+memory. Dumps without any stat line, e.g., the text before the first begin
+marker or a dump of two dumps in a row, are not indexed, i.e., dump N is the
+N-th dump with stats, like the stats parser counts the dumps of a stream.
+
+With --dump_index_dir the index is cached in that directory, one file per
+stats file named after the hash of its path, e.g., 3f2a...c1.dumpidx. The
+directories of the stats files are never written to. The cached index is
+rebuilt if the size or the modification time of the stats file changed.
+Failing to write the cache, e.g., because the directory is read-only, is not
+an error.
+'''
+
+PARTREF = 'all.modules.m5.importer.statsfile'
+
+import hashlib
+import mmap
+import os
+import re
+import stat
+
+from m5mbridge import bug, panic, warning, debug
+from m5mbridge.inputfile import compressionFormat
+
+BEGIN_DUMP_MARKER = 'Begin Simulation Statistics'
+INDEX_SUFFIX = '.dumpidx'
+INDEX_VERSION = 2
+CHUNK_SIZE = 1 << 20
+# Matches a stat line anywhere in a dump like STAT_LINE_RE of the stats parser
+# matches a single line.
+STAT_TEXT_RE = re.compile(r'^[\.0-9a-zA-z_:]*[^\S\n]+[\w\.]+\s', re.M)
+
+def hasStats(data, begin=0, end=None):
+    '''Return True if the text data[begin:end] of a dump has a stat line.'''
+    if end is None:
+        end = len(data)
+    return STAT_TEXT_RE.search(data, begin, end) is not None
+
+def isStatsFile(path):
+    '''Return True if `path' is a regular file that can be memory-mapped,
+    i.e., it is not compressed.'''
+    try:
+        if not stat.S_ISREG(os.stat(path).st_mode):
+            return False
+    except OSError:
+        return False
+    return compressionFormat(path) is None
+
+def iterLines(data, begin, end):
+    '''Iterate over the lines of data[begin:end], e.g., of a memory-mapped
+    file. The data is split into chunks of complete lines, so that only a
+    chunk and not all the data is copied out of a mapped file.'''
+    pos = begin
+    while pos < end:
+        eol = data.find('\n', min(pos + CHUNK_SIZE, end), end)
+        eol = end if eol < 0 else eol + 1
+        for line in data[pos:eol].splitlines(True):
+            yield line
+        pos = eol
+
+class StatsFile(object):
+    def __init__(self, path, cacheDir=None):
+        self.path = path
+        self.cacheDir = cacheDir
+        self.file = open(path, 'rb')
+        st = os.fstat(self.file.fileno())
+        self.signature = (st.st_size, int(st.st_mtime))
+        if st.st_size:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # mmap refuses to map empty files.
+            self.data = ''
+        self.index = self.loadIndex()
+        if self.index is None:
+            self.index = self.buildIndex()
+            self.saveIndex()
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def buildIndex(self):
+        '''Return a list of (begin, end) byte offsets, one for every dump.
+
+        A dump begins with the line after its begin marker and ends at the
+        start of the next begin marker line. The text before the first begin
+        marker is a dump as well, e.g., of a stats file without any begin
+        marker. Dumps without stats are left out.
+        '''
+        data = self.data
+        size = len(data)
+        starts = []
+        pos = data.find(BEGIN_DUMP_MARKER)
+        while pos >= 0:
+            lineStart = data.rfind('\n', 0, pos) + 1
+            lineEnd = data.find('\n', pos)
+            lineEnd = size if lineEnd < 0 else lineEnd + 1
+            starts.append((lineStart, lineEnd))
+            pos = data.find(BEGIN_DUMP_MARKER, lineEnd)
+
+        index = [(0, starts and starts[0][0] or size)]
+        for n, (lineStart, begin) in enumerate(starts):
+            end = n+1 < len(starts) and starts[n+1][0] or size
+            index.append((begin, end))
+        index = [(begin, end) for begin, end in index if hasStats(data, begin, end)]
+        self.debug('indexed {0} dumps of {1}'.format(len(index), self.path))
+        return index
+
+    def indexPath(self):
+        # Resolve links, e.g., /dev/stdin redirected from a stats file, to
+        # share the index of the actual stats file.
+        key = hashlib.sha1(os.path.realpath(self.path)).hexdigest()
+        return os.path.join(self.cacheDir, key + INDEX_SUFFIX)
+
+    def loadIndex(self):
+        if not self.cacheDir:
+            return None
+        try:
+            with open(self.indexPath(), 'r') as f:
+                header = f.readline().split()
+                if header != map(str, (INDEX_VERSION,) + self.signature):
+                    self.debug('stale dump index {0}'.format(self.indexPath()))
+                    return None
+                return [tuple(map(int, line.split())) for line in f]
+        except (IOError, ValueError):
+            return None
+
+    def saveIndex(self):
+        if not self.cacheDir:
+            return
+        # Concurrent conversions may share the cache directory.
+        tmpPath = '{0}.{1}'.format(self.indexPath(), os.getpid())
+        try:
+            if not os.path.isdir(self.cacheDir):
+                os.makedirs(self.cacheDir)
+            with open(tmpPath, 'w') as f:
+                f.write('{0} {1} {2}\n'.format(INDEX_VERSION, *self.signature))
+                for begin, end in self.index:
+                    f.write('{0} {1}\n'.format(begin, end))
+            os.rename(tmpPath, self.indexPath())
+        except (IOError, OSError), e:
+            self.debug('cannot cache dump index: {0}'.format(e))
+
+    def dump(self, n):
+        '''Return the text of dump `n'. Negative numbers count from the end.'''
+        begin, end = self.index[n]
+        return self.data[begin:end]
+
+    def dumpLines(self, n):
+        '''Iterate over the lines of dump `n', see iterLines().'''
+        begin, end = self.index[n]
+        return iterLines(self.data, begin, end)
+
+    def dumps(self):
+        '''Iterate over the texts of all dumps.'''
+        for n in xrange(len(self.index)):
+            yield self.dump(n)
@@ -0,0 +1,95 @@
+'''A whitelist of the stats that are actually read.
+
+gem5 writes thousands of stats, but only a small fraction of them is ever
+read: the stats translated to McPAT stats by the translators and the stats
+used to calculate stats in generateCalcStats(). The stats parser uses the
+whitelist to drop all other stats right when a line is tokenized, so that they
+are neither stored nor routed to their components.
+
+The whitelist holds stat names relative to a component, e.g., numCycles or
+iq.FU_type_0::IntAlu. A stat of the stats file is kept if the name matches
+the end of the stat's key after a dot, e.g., system.cpu0.numCycles matches
+numCycles. There are three kinds of names:
+
+  name         -- matches the stat name and all elements of a vector of that
+                  name, e.g., ReadReq_accesses matches
+                  ReadReq_accesses::0 and ReadReq_accesses::total. This is
+                  how Translator.get_component_statistic() looks up stats.
+  name::*      -- matches the elements of a vector only, e.g.,
+                  iq.FU_type_0::* matches iq.FU_type_0::IntAlu.
+  glob pattern -- any other name with a * is a shell-style pattern for the
+                  whole key, e.g., *routing_counts*.
+
+Use --full_stats to disable the whitelist, e.g., to get all stats in
+summary.xml.
+'''
+
+PARTREF = 'all.modules.m5.importer.statsfilter'
+
+import fnmatch
+import re
+
+from m5mbridge import bug, panic, warning, debug
+from generatecalcparts import CALC_STATS
+
+# Stats read outside of the translators and generateCalcStats(): sim_seconds
+# by the tree2datatable exporter of the M5 module and sim_ticks for the total
+# cycles.
+ALWAYS_KEPT_STATS = ['sim_seconds', 'sim_ticks']
+
+class StatsWhitelist(object):
+    def __init__(self, names=()):
+        self.exact = set()
+        self.vectors = set()
+        self.patterns = []
+        self.patternRe = None
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        if name.endswith('::*'):
+            self.vectors.add(name[:-3])
+        elif '*' in name:
+            self.patterns.append(name)
+            self.patternRe = re.compile('|'.join(fnmatch.translate(p) for p in self.patterns))
+        else:
+            self.exact.add(name)
+            self.vectors.add(name)
+
+    def __contains__(self, key):
+        exact = self.exact
+        vectors = self.vectors
+        base, sep, element = key.partition('::')
+        # Try all tails of the key that start after a dot, beginning with the
+        # key itself.
+        start = 0
+        while True:
+            if key[start:] in exact:
+                return True
+            if sep and base[start:] in vectors:
+                return True
+            start = base.find('.', start) + 1
+            if not start:
+                break
+        return self.patternRe is not None and self.patternRe.match(key) is not None
+
+    def __len__(self):
+        return len(self.exact) + len(self.vectors) + len(self.patterns)
+
+def statsWhitelist(machine):
+    '''Return the whitelist of the stats read for `machine', or None if all
+    stats must be kept (--full_stats).'''
+    if getattr(machine.options, 'full_stats', False):
+        return None
+
+    whitelist = StatsWhitelist(CALC_STATS + ALWAYS_KEPT_STATS)
+
+    def addTranslatorStats(component):
+        translator = component.translator
+        if translator:
+            for stat in translator.power_statistics.itervalues():
+                whitelist.add(stat[translator.M5_STAT])
+
+    machine.visit(addTranslatorStats)
+    debug.pp(PARTREF, 'stats whitelist: {0} exact, {1} vector, {2} pattern names'.format(len(whitelist.exact), len(whitelist.vectors), len(whitelist.patterns)))
+    return whitelist
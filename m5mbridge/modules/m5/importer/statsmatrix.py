@@ -0,0 +1,174 @@
+'''A matrix of the stats of all dumps of a stats file.
+
+The importers of stats.py import one stats dict at a time into the component
+tree. For an analysis of a whole run, e.g., the average of a stat over a phase
+of the run, the StatsMatrix holds the stats of all dumps at once: a NumPy
+array of shape dumps x columns with one column per stat. Missing values, e.g.,
+of stats that are not part of every dump, are NaN.
+
+The columns are sorted by the keys of the stats, e.g., system.cpu0.numCycles,
+so the column of a stat is the same for all stats files with the same stats.
+Every column also belongs to a component of the machine, which is found in
+the same way M5StatsImporter routes a stat to its component (see
+statrouter.py), so that the stats of a component can be looked up by the id
+of the component and the name of the stat, e.g.,
+matrix.column('system.cpu0', 'numCycles').
+
+The calculated stats of CALC_COLUMNS, which mirror the sums and differences
+computed per dump by generateCalcStats(), are added as extra columns. They are
+computed by vectorized column operations for all dumps at once.
+
+NumPy is only required for the stats matrix.
+'''
+
+PARTREF = 'all.modules.m5.importer.statsmatrix'
+
+from m5mbridge import bug, panic, warning, debug
+from stats import parseStatsDumpsFromFile
+from statrouter import statRouter
+
+# Calculated stats as (component type, name, stats to add, stats to subtract).
+# The stats are read from the component of the given type. Like
+# tryGrabComponentStat() missing stats count as zero.
+CALC_COLUMNS = [
+    ('AlphaTLB', 'total_accesses', ['data_hits', 'data_misses', 'fetch_hits', 'fetch_misses'], []),
+    ('AlphaTLB', 'write_accesses', ['write_hits', 'write_misses'], []),
+    ('AlphaTLB', 'read_accesses', ['read_hits', 'read_misses'], []),
+    ('DerivO3CPU', 'fp_instructions', ['iq.FU_type_0::FloatAdd', 'iq.FU_type_0::FloatCmp', 'iq.FU_type_0::FloatCvt',
+                                       'iq.FU_type_0::FloatMult', 'iq.FU_type_0::FloatDiv', 'iq.FU_type_0::FloatSqrt'], []),
+    ('DerivO3CPU', 'int_instructions', ['iq.FU_type_0::No_OpClass', 'iq.FU_type_0::IntAlu', 'iq.FU_type_0::IntMult',
+                                        'iq.FU_type_0::IntDiv', 'iq.FU_type_0::IprAccess'], []),
+    ('DerivO3CPU', 'load_instructions', ['iq.FU_type_0::MemRead', 'iq.FU_type_0::InstPrefetch'], []),
+    ('DerivO3CPU', 'store_instructions', ['iq.FU_type_0::MemWrite'], []),
+    ('DerivO3CPU', 'num_busy_cycles', ['numCycles'], ['idleCycles']),
+]
+
+def importNumpy():
+    try:
+        import numpy
+    except ImportError:
+        panic("NumPy is required for the stats matrix.", 8)
+    return numpy
+
+class StatsMatrix(object):
+    def __init__(self):
+        # The stat keys of the columns and the reverse mapping.
+        self.columns = []
+        self.columnIndex = {}
+        # Maps component ids to dicts of stat names to columns.
+        self.componentColumns = {}
+        # The numbers of the dumps of the rows.
+        self.dumps = []
+        self.data = None
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def addColumn(self, key, componentId, statName):
+        self.columnIndex[key] = len(self.columns)
+        self.columns.append(key)
+        self.componentColumns.setdefault(componentId, {})[statName] = self.columnIndex[key]
+
+    def column(self, componentId, statName):
+        '''Return the values of a stat of a component for all dumps, or None
+        if there is no such stat.'''
+        col = self.componentColumns.get(componentId, {}).get(statName)
+        if col is None:
+            return None
+        return self.data[:, col]
+
+    def stats(self, row):
+        '''Return the stats dict of a row like the stats parser does, e.g.,
+        to import a single dump into a machine.'''
+        numpy = importNumpy()
+        sht = {}
+        for key, value in zip(self.columns, self.data[row]):
+            if numpy.isnan(value):
+                continue
+            value = float(value)
+            sht[key] = int(value) if value.is_integer() else value
+        return sht
+
+    def save(self, path):
+        '''Write the matrix to a NumPy archive with the arrays stats, columns
+        and dumps.'''
+        numpy = importNumpy()
+        # numpy.savez appends .npz to file names, but not to open files.
+        with open(path, 'wb') as f:
+            numpy.savez(f, stats=self.data, columns=numpy.array(self.columns), dumps=numpy.array(self.dumps))
+
+def importStatsMatrixFromFile(stats_file_path, machine):
+    '''Parse all dumps of a stats file given as a path into a StatsMatrix.
+    The stats are not imported into the machine.'''
+    numpy = importNumpy()
+    matrix = StatsMatrix()
+
+    rows = []
+    keys = set()
+    for n, sht in parseStatsDumpsFromFile(stats_file_path, machine):
+        matrix.dumps.append(n)
+        rows.append(sht)
+        keys.update(sht)
+
+    route = statRouter(machine).route
+    for key in sorted(keys):
+        componentId, statName = route(key)
+        matrix.addColumn(key, componentId, statName)
+
+    data = numpy.empty((len(rows), len(matrix.columns)), dtype=numpy.float64)
+    data.fill(numpy.nan)
+    columnIndex = matrix.columnIndex
+    for row, sht in enumerate(rows):
+        for key, value in sht.iteritems():
+            if not isinstance(value, basestring):
+                data[row, columnIndex[key]] = value
+    matrix.data = data
+    matrix.debug('{0} dumps x {1} stats'.format(*data.shape))
+
+    addCalcColumns(matrix, machine)
+    return matrix
+
+def addCalcColumns(matrix, machine):
+    '''Add the calculated stats of CALC_COLUMNS and the total_cycles of the
+    system to `matrix'.'''
+    numpy = importNumpy()
+    dumps = len(matrix.dumps)
+
+    def grab(componentId, statName):
+        values = matrix.column(componentId, statName)
+        if values is None:
+            return numpy.zeros(dumps)
+        # Like a missing stat a stat missing in some dumps counts as zero.
+        return numpy.where(numpy.isnan(values), 0, values)
+
+    newColumns = []
+    for componentId in sorted(machine.cht):
+        ptype = machine.cht[componentId].params['type']
+        for (calcType, name, added, subtracted) in CALC_COLUMNS:
+            if calcType != ptype:
+                continue
+            values = numpy.zeros(dumps)
+            for stat in added:
+                values += grab(componentId, stat)
+            for stat in subtracted:
+                values -= grab(componentId, stat)
+            newColumns.append((componentId, name, values))
+
+    system = machine.options.system_name
+    fastestClock = machine.cht[system].params.get('fastest_clock')
+    ticks = matrix.column(system, 'sim_ticks')
+    if ticks is not None and fastestClock:
+        newColumns.append((system, 'total_cycles', numpy.floor_divide(ticks, int(fastestClock))))
+
+    appended = []
+    for componentId, name, values in newColumns:
+        key = '{0}.{1}'.format(componentId, name)
+        if key in matrix.columnIndex:
+            # Like generateCalcStats() replace a stat of the same name.
+            matrix.data[:, matrix.columnIndex[key]] = values
+        else:
+            matrix.addColumn(key, componentId, name)
+            appended.append(values)
+    if appended:
+        matrix.data = numpy.column_stack([matrix.data] + appended)
+    matrix.debug('{0} calculated stats'.format(len(newColumns)))
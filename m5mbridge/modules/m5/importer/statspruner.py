@@ -0,0 +1,90 @@
+'''Pruning of the stats of components after their translation.
+
+Once the stats are translated, most raw stats in component.statistics are
+never read again: McPAT and the data table only get the translated stats, and
+the root component collects every stat of a component that does not exist in
+the machine. A machine of the live bridge lives for the whole simulation and
+is pickled on every recorded event, so with --prune_stats the stats that
+neither the translator of a component nor the calculated stats read are
+dropped right after the import.
+
+A raw stat of a component is retained if its name is in the whitelist (see
+statsfilter.py) of the component's translator, i.e., the stats the translator
+reads, or one of the stats read by generateCalcStats(). The calculated stats
+themselves are always retained. Unlike the whitelist of the stats parser,
+which holds the stats read by any translator, the names are checked against
+the translator of the component that has the stat.
+
+The routes of the dropped stats are removed from the route cache, later
+updates of the stats skip them (see M5StatsImporter.update()). Every full
+import prunes the stats again.
+'''
+
+PARTREF = 'all.modules.m5.importer.statspruner'
+
+import sys
+
+from m5mbridge import bug, panic, warning, debug
+from generatecalcparts import CALC_STATS
+from statsfilter import StatsWhitelist, ALWAYS_KEPT_STATS
+
+class StatsPruneReport(object):
+    '''The number of retained and discarded stats and the memory they use,
+    i.e., the size of the stats dicts and their values. The keys are shared
+    with the route cache and are not included.'''
+    def __init__(self):
+        self.retained = 0
+        self.discarded = 0
+        self.retainedBytes = 0
+        self.discardedBytes = 0
+
+    def __str__(self):
+        return 'stats pruning: retained {0} stats ({1:.1f}KB), discarded {2} stats ({3:.1f}KB)'.format(
+            self.retained, self.retainedBytes / 1024.0, self.discarded, self.discardedBytes / 1024.0)
+
+def translatorWhitelist(translator):
+    '''Return the whitelist of the stats a component with `translator'
+    reads.'''
+    whitelist = StatsWhitelist(CALC_STATS + ALWAYS_KEPT_STATS)
+    if translator:
+        for stat in translator.power_statistics.itervalues():
+            whitelist.add(stat[translator.M5_STAT])
+    return whitelist
+
+def statsSize(statistics):
+    return sys.getsizeof(statistics) + sum(sys.getsizeof(value) for value in statistics.itervalues())
+
+def pruneStats(machine, sht, router):
+    '''Drop the stats of the stats dict `sht' that are not read from the
+    components of `machine' and return a StatsPruneReport.'''
+    cht = machine.cht
+    routes = router.routes
+    # The components of a translator class share their translator.
+    whitelists = {}
+    discarded = {}
+    for key in sht:
+        componentId, name = routes[key]
+        component = cht[componentId]
+        whitelist = whitelists.get(component.translator)
+        if whitelist is None:
+            whitelist = whitelists[component.translator] = translatorWhitelist(component.translator)
+        if not name in whitelist:
+            discarded.setdefault(component, set()).add(name)
+            del routes[key]
+
+    report = StatsPruneReport()
+    # A renamed component may be in cht under two ids.
+    for component in set(cht.itervalues()):
+        statistics = component.statistics
+        names = discarded.get(component, ())
+        size = statsSize(statistics)
+        if names:
+            # Dicts never shrink, only a new dict frees the memory.
+            statistics = component.statistics = dict((name, value) for name, value in statistics.iteritems() if not name in names)
+        retainedSize = statsSize(statistics)
+        report.retained += len(statistics)
+        report.discarded += len(names)
+        report.retainedBytes += retainedSize
+        report.discardedBytes += size - retainedSize
+    debug.pp(PARTREF, str(report))
+    return report
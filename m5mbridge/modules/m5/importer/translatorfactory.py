@@ -11,9 +11,13 @@ class TranslatorFactory(object):
     objects are responsible for grabbing the right stats and naming them
     correctly.
     If no translator is needed, this function returns None.
+
+    Translators keep no state of the components they translate. If a dict
+    `shared' is given, the components of a translator class share the
+    translator stored in it.
     '''
     @staticmethod
-    def create(options, component):
+    def create(options, component, shared=None):
 
         translatorClass = None
 
@@ -32,7 +36,7 @@ class TranslatorFactory(object):
                     translatorClass = translators.Crossbar
 
                 if translatorClass:
-                    return translatorClass(options)
+                    return TranslatorFactory.instantiate(translatorClass, options, shared)
                 return None
 
         if options.cpu_name in component.name:
@@ -80,6 +84,15 @@ class TranslatorFactory(object):
 
         if translatorClass:
             debug.pp(PARTREF, 'component {0}: using translator {1}'.format(component.name, translatorClass.__name__))
-            return translatorClass(options)
+            return TranslatorFactory.instantiate(translatorClass, options, shared)
         debug.pp(PARTREF, 'component {0}: no translator found'.format(component.name))
         return None
+
+    @staticmethod
+    def instantiate(translatorClass, options, shared):
+        if shared is None:
+            return translatorClass(options)
+        translator = shared.get(translatorClass)
+        if translator is None:
+            translator = shared[translatorClass] = translatorClass(options)
+        return translator
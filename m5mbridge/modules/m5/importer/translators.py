@@ -1,5 +1,3 @@
-import pdb
-
 from m5mbridge import bug, panic, warning
 from m5mbridge.machine.translator import Translator
 from m5mbridge.machine.component import SystemComponent
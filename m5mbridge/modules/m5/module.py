@@ -9,12 +9,18 @@ from m5.stats import registerOutput
 
 from m5mbridge import debug
 from importer import stats
+from importer.statsdelta import StatsDelta
 from exporter.tree2datatable import tree2DataTable
 
 class M5Module(object):
     def __init__(self):
         self.output = m5.internal.stats.initTextStream()
+        # The length of the stats in self.output that were imported already,
+        # if the stream cannot be truncated.
+        self.consumed = 0
         self.patTable = ''
+        # Created on the first import if --delta_stats is given.
+        self.delta = None
         registerOutput(self.output)
         readstats.setReadstatsHandler(lambda l,o: self.readstats(l, o))
 
@@ -23,8 +29,29 @@ class M5Module(object):
 
     def importStats(self, machine):
         '''Call this function via the Controller.accessMachine-method.'''
+        s = self.takeStats()
+        if machine.options.delta_stats and not self.delta:
+            self.delta = StatsDelta()
+        stats.importStats(cStringIO.StringIO(s), machine, self.delta)
+        # The stat keys are routed to the components once, later dumps hit
+        # the route cache of the machine.
+        if debug.enabled(PARTREF):
+            self.debug(machine.statRouter.summary())
+
+    def takeStats(self):
+        '''Return the stats written to the output stream since the last
+        import.
+
+        Only the new dump is parsed, the stream is truncated so that its
+        memory does not grow with the number of dumps. Streams that cannot
+        be truncated are read from the end of the last import on.'''
         s = self.output.str()
-        stats.importStats(cStringIO.StringIO(s), machine)
+        if hasattr(self.output, 'truncate'):
+            self.output.seek(0)
+            self.output.truncate()
+            return s
+        s, self.consumed = s[self.consumed:], len(s)
+        return s
 
     def stateModified(self, controller, event):
         self.debug('rcv event {0}'.format(event))
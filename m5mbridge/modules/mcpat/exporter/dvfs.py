@@ -0,0 +1,98 @@
+PARTREF = 'all.modules.mcpat.exporter.dvfs'
+
+from m5mbridge import bug, panic, warning, debug
+from m5mbridge.machine.visitor import Visitor
+
+def dfsToDvs(dfs):
+    '''Find the voltage scaling for a frequency scaling.
+
+    The relation is a linear fit of the data from Gaurav Dhiman's Hotpower
+    paper:
+
+    DFS	        FREQ	VOLT	PERC_VOLT
+    1	        2600	1.25	1
+    0.730769231	1900	1.15	0.92
+    0.538461538	1400	1.05	0.84
+    0.307692308	800	    0.9	    0.72
+    dvs = 0.4032*dfs + 0.6102
+    '''
+    dvs = 0.4032*dfs + 0.6102
+    return dvs
+
+class DvfsOperatingPoint(Visitor):
+    '''Sets the translated params of a machine for a DVFS operating point.
+
+    A DVFS sweep imports the config and stats files once and then exports the
+    same machine for several operating points. This visitor scales the clock
+    rates of the cores by the DFS factor and sets the sys_vdd_scale param of
+    the system to the matching voltage scaling, as if the machine had been
+    created with --sys_vdd_scale. The clock rates of the other clock domains,
+    e.g., of the buses and the memory, are not changed.
+
+    The unscaled values are saved in `base', so that the same visitor can be
+    applied for any number of operating points in a row.
+    '''
+    SCALED_PARAMS = ['clock_rate']
+
+    def __init__(self, options):
+        super(DvfsOperatingPoint, self).__init__()
+        self.options = options
+        self.base = {}
+        self.dfs = 1.0
+        self.dvs = 1.0
+
+    def debug(self, *args):
+        debug.pp(PARTREF, *args)
+
+    def setFactor(self, dfs):
+        self.dfs = dfs
+        self.dvs = dfsToDvs(dfs)
+        self.debug('operating point dfs={0} dvs={1}'.format(self.dfs, self.dvs))
+
+    def visit(self, component):
+        if component.name == self.options.system_name:
+            self.setVddScale(component)
+            return
+
+        for key in self.SCALED_PARAMS:
+            if not key in component.translated_params:
+                continue
+            base = self.base.setdefault((component.id, key), component.translated_params[key])
+            try:
+                component.translated_params[key] = str(int(float(base)*self.dfs))
+            except ValueError:
+                # Not a number, e.g., NaV, leave it alone.
+                pass
+
+    def setVddScale(self, system):
+        # If there is no such param, insert it where the System translator
+        # would have put it.
+        system.translated_params.insert('sys_vdd_scale', str(self.dvs), after='core_tech_node')
+
+def dfsPercent(dfs):
+    '''Return the DFS factor in percent as it is used in the names of the
+    output files, e.g., 73 for 0.73.'''
+    return int(round(dfs*100))
+
+def parseDfsFactors(arg):
+    '''Parse the comma separated list of DFS factors of --dfs_sweep.
+
+    The output files of the operating points are named after the factors in
+    percent, factors with the same percent, e.g., 0.73 and 0.731, would
+    overwrite each other's files and are rejected.'''
+    factors = []
+    # Maps the percent of the factors to their strings.
+    percents = {}
+    for s in filter(len, arg.split(',')):
+        try:
+            dfs = float(s)
+        except ValueError:
+            panic("invalid DFS factor '{0}' in --dfs_sweep.".format(s), 8)
+        if dfs <= 0:
+            panic("DFS factor must be positive: '{0}'.".format(s), 8)
+        percent = dfsPercent(dfs)
+        if percent in percents:
+            panic("DFS factors '{0}' and '{1}' in --dfs_sweep are both {2}%, the DFS factors must differ in percent.".format(percents[percent], s, percent), 8)
+        percents[percent] = s
+        factors.append(dfs)
+    return factors
@@ -4,6 +4,7 @@ from m5mbridge import bug, panic, warning, debug
 from xmldocvisitor import XmlDocVisitor
 from m5mbridge.machine.component import Component, MCPAT_EXPORT_CONF
 from m5mbridge.machine.visitor import Visitor
+from m5mbridge.machine.statvalue import formatStatValue
 
 class MachineGenerator(object):
     def __init__(self, xmldoc):
@@ -27,7 +28,7 @@ class MachineStatsGenerator(MachineGenerator):
         for statKey in component.translated_statistics_order:
             newStat = self.doc.createElement("stat")
             newStat.setAttribute("name", statKey)
-            newStat.setAttribute("value", component.translated_statistics[statKey])
+            newStat.setAttribute("value", formatStatValue(component.translated_statistics[statKey]))
             docNode.appendChild(newStat)
 
 class DefaultOutputFilter(Visitor):
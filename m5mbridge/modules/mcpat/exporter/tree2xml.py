@@ -2,6 +2,7 @@ PARTREF = 'all.modules.mcpat.exporter.tree2xml'
 
 from m5mbridge import bug, panic, warning, debug
 from xmldocvisitor import XmlDocVisitor
+from m5mbridge.machine.statvalue import formatStatValue
 
 class Tree2XmlVisitor(XmlDocVisitor):
     def __init__(self, xmldoc, options):
@@ -40,5 +41,5 @@ class Tree2XmlVisitor(XmlDocVisitor):
         for statKey in component.statistics:
             newStat = self.doc.createElement("stat")
             newStat.setAttribute("name", statKey)
-            newStat.setAttribute("value", component.statistics[statKey])
+            newStat.setAttribute("value", formatStatValue(component.statistics[statKey]))
             docNode.appendChild(newStat)
@@ -2,11 +2,16 @@
 
 Each component of the m5parser's component-tree is extended with an attribute
 that points to such an object.
+
+The values are converted to numbers once, e.g., ('0.0853658', 'W') of the
+McPat output becomes (0.0853658, 'W').
 '''
 
+from m5mbridge.machine.statvalue import parseStatValue
+
 class PatData(object):
     def __init__(self, attributes):
-        self.area = attributes['Area']
+        self.area = numericAttribute(attributes['Area'])
         self.power = {}
         self.attributes = attributes
         self.addPowerStat('Subthreshold Leakage')
@@ -15,4 +20,8 @@ class PatData(object):
         self.addPowerStat('Runtime Dynamic')
 
     def addPowerStat(self, name):
-        self.power[name] = self.attributes[name]
+        self.power[name] = numericAttribute(self.attributes[name])
+
+def numericAttribute(attribute):
+    (value, unit) = attribute
+    return (parseStatValue(value), unit)
@@ -0,0 +1,104 @@
+'''Profiling of the command line tool.
+
+The m5-mcpat-parser is often invoked thousands of times in a row for short
+conversions, so the cold start of the interpreter matters. The ImportProfiler
+measures the time spent importing modules. It hooks into __import__ and
+records for every module the cumulative time of its import, i.e., including
+the imports of the module, and the self time, i.e., excluding them.
+
+The profiler must be installed before the m5mbridge is imported, that is why
+the command line tool checks for --profile_imports before it parses its
+options. The time to start the interpreter itself is not included.
+
+The readers of compressed input files record the amount of data they
+decompressed and the time it took (see inputfile.py), reportIo() prints the
+throughput for --profile_io.
+'''
+
+import __builtin__
+import sys
+import time
+
+class ImportProfiler(object):
+    def __init__(self):
+        self.records = []
+        self.stack = []
+        self.total = 0.0
+        self.origImport = None
+
+    def install(self):
+        self.origImport = __builtin__.__import__
+        __builtin__.__import__ = self.profiledImport
+
+    def uninstall(self):
+        if self.origImport:
+            __builtin__.__import__ = self.origImport
+            self.origImport = None
+
+    def profiledImport(self, name, globals=None, locals=None, fromlist=None, level=-1):
+        numModules = len(sys.modules)
+        self.stack.append(0.0)
+        start = time.time()
+        try:
+            return self.origImport(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - start
+            childTime = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += elapsed
+            else:
+                self.total += elapsed
+            # Imports of modules that were imported before are cheap and not
+            # worth recording.
+            if len(sys.modules) != numModules:
+                self.records.append((qualifiedName(name, globals, fromlist), elapsed, elapsed - childTime))
+
+    def report(self, out, limit=25):
+        print >>out, 'import profile: {0:.1f}ms in {1} imports'.format(self.total*1e3, len(self.records))
+        print >>out, '{0:>12} {1:>12}  {2}'.format('cumulative', 'self', 'module')
+        for name, cumulative, self_ in sorted(self.records, key=lambda r: r[2], reverse=True)[:limit]:
+            print >>out, '{0:>10.1f}ms {1:>10.1f}ms  {2}'.format(cumulative*1e3, self_*1e3, name)
+
+    def checkBudget(self, budget):
+        '''Return False if the total import time exceeds `budget' milliseconds.'''
+        return self.total*1e3 <= budget
+
+def qualifiedName(name, globals, fromlist):
+    '''Resolve implicit relative imports, e.g., 'setup' inside the m5mbridge
+    package to 'm5mbridge.setup', and imports of submodules, e.g., 'from
+    m5mbridge import manifest' to 'm5mbridge.manifest'.'''
+    for attr in fromlist or []:
+        if sys.modules.get(name + '.' + attr) is not None:
+            name = name + '.' + attr
+            break
+    if globals:
+        package = globals.get('__package__')
+        if package is None:
+            package = globals.get('__name__', '')
+            if '__path__' not in globals:
+                package = package.rpartition('.')[0]
+        if package and sys.modules.get(package + '.' + name) is not None:
+            return package + '.' + name
+    return name
+
+# The profiler installed by installImportProfiler()
+importProfiler = None
+
+def installImportProfiler():
+    global importProfiler
+    importProfiler = ImportProfiler()
+    importProfiler.install()
+    return importProfiler
+
+# The records of recordIo() as (name, format, compressed bytes, bytes, seconds)
+ioRecords = []
+
+def recordIo(name, format, compressedBytes, bytes, seconds):
+    ioRecords.append((name, format, compressedBytes, bytes, seconds))
+
+def reportIo(out):
+    print >>out, 'io profile: {0} compressed input files'.format(len(ioRecords))
+    for (name, format, compressedBytes, bytes, seconds) in ioRecords:
+        throughput = seconds and bytes/seconds/1e6 or 0.0
+        print >>out, '{0:>10.1f}ms {1:>9.1f}MB/s  {2} ({3}, {4} -> {5} bytes)'.format(seconds*1e3, throughput, name, format, compressedBytes, bytes)
+    del ioRecords[:]
@@ -0,0 +1,154 @@
+'''A columnar results file for batch conversions.
+
+The results file has one row per run directory and one column per selected
+translated param or statistic of the machine. A column is named by the id of
+the component and the McPAT name of the param or statistic, e.g.,
+system.cpu0.committed_instructions. The rows are buffered in memory and the
+file is written once at the end of a sweep.
+
+The format is selected by the extension of the file name: .npz writes a NumPy
+archive with one array per column plus the array run_dir, any other extension
+writes a CSV file. Numeric columns are stored as float64 arrays with NaN for
+missing values, all other columns as string arrays. NumPy is only required
+for .npz files.
+
+Run directories that are skipped because their inputs did not change keep
+the row of the previous results file.
+'''
+
+import csv
+import fnmatch
+import os
+
+from m5mbridge import panic, warning
+from m5mbridge.machine.visitor import Visitor
+
+class ResultsRowVisitor(Visitor):
+    '''Collects the translated params and statistics of all components whose
+    column name matches one of the `patterns'.'''
+    def __init__(self, patterns):
+        super(ResultsRowVisitor, self).__init__()
+        self.patterns = patterns
+        self.row = {}
+
+    def visit(self, component):
+        for values in (component.translated_params, component.translated_statistics):
+            for key, value in values.iteritems():
+                column = '{0}.{1}'.format(component.id, key)
+                if self.selected(column):
+                    self.row[column] = value
+
+    def selected(self, column):
+        for pattern in self.patterns:
+            if fnmatch.fnmatchcase(column, pattern):
+                return True
+        return False
+
+def resultsRow(machine, columns):
+    '''Return the row of `machine' for the comma separated column patterns.'''
+    visitor = ResultsRowVisitor(filter(len, columns.split(',')))
+    machine.visit(visitor)
+    return visitor.row
+
+class ResultsTable(object):
+    def __init__(self, path):
+        self.path = path
+        self.rows = {}
+        self.previousRows = {}
+        if self.isNpz():
+            # Fail before the sweep, not at its end.
+            importNumpy()
+        self.load()
+
+    def isNpz(self):
+        return self.path.endswith('.npz')
+
+    def load(self):
+        '''Load the rows of the previous results file for skipped run
+        directories.'''
+        if not os.path.exists(self.path):
+            return
+        try:
+            if self.isNpz():
+                self.previousRows = loadNpz(self.path)
+            else:
+                self.previousRows = loadCsv(self.path)
+        except Exception, e:
+            warning("Ignoring unreadable results file {0}: {1}".format(self.path, e))
+
+    def add(self, dir, row):
+        self.rows[dir] = row
+
+    def save(self, dirs):
+        '''Write one row for every run directory in `dirs' that was processed
+        now or in a previous sweep.'''
+        dirs = [dir for dir in dirs if dir in self.rows or dir in self.previousRows]
+        rows = [self.rows.get(dir, self.previousRows.get(dir)) for dir in dirs]
+        columns = sorted(set(column for row in rows for column in row))
+
+        # Write to a temporary file first, an interrupted sweep must not
+        # leave a truncated results file behind.
+        tmpPath = self.path + '.tmp'
+        if self.isNpz():
+            saveNpz(tmpPath, dirs, columns, rows)
+        else:
+            saveCsv(tmpPath, dirs, columns, rows)
+        os.rename(tmpPath, self.path)
+
+    def report(self):
+        return '{0} new rows'.format(len(self.rows))
+
+def saveCsv(path, dirs, columns, rows):
+    with open(path, 'wb') as f:
+        writer = csv.writer(f)
+        writer.writerow(['run_dir'] + columns)
+        for dir, row in zip(dirs, rows):
+            writer.writerow([dir] + [row.get(column, '') for column in columns])
+
+def loadCsv(path):
+    rows = {}
+    with open(path, 'rb') as f:
+        reader = csv.reader(f)
+        columns = reader.next()[1:]
+        for line in reader:
+            rows[line[0]] = dict((column, value) for column, value in zip(columns, line[1:]) if value != '')
+    return rows
+
+def importNumpy():
+    try:
+        import numpy
+    except ImportError:
+        panic("NumPy is required for .npz results files, use a .csv file instead.", 8)
+    return numpy
+
+def saveNpz(path, dirs, columns, rows):
+    numpy = importNumpy()
+    arrays = dict(run_dir=numpy.array(dirs))
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        try:
+            arrays[column] = numpy.array([float('nan') if v is None else float(v) for v in values], dtype=numpy.float64)
+        except ValueError:
+            arrays[column] = numpy.array(['' if v is None else v for v in values])
+    # numpy.savez appends .npz to file names, but not to open files.
+    with open(path, 'wb') as f:
+        numpy.savez(f, **arrays)
+
+def loadNpz(path):
+    numpy = importNumpy()
+    rows = {}
+    archive = numpy.load(path)
+    dirs = [str(dir) for dir in archive['run_dir']]
+    for dir in dirs:
+        rows[dir] = {}
+    for column in archive.files:
+        if column == 'run_dir':
+            continue
+        values = archive[column]
+        for dir, value in zip(dirs, values):
+            if values.dtype.kind == 'f':
+                if not numpy.isnan(value):
+                    rows[dir][column] = repr(float(value))
+            elif value != '':
+                rows[dir][column] = str(value)
+    return rows
@@ -14,18 +14,14 @@ suspect that M5's custom import handler is causing this, because there is no
 such issue if the code is run in the testbed environment.
 '''
 
-from os import path
-
-import m5
-
-from modules.hotspot.module import HotspotModule
-from modules.m5.module import M5Module
-from modules.mcpat.module import McPatModule
-import factory
-
 # A dictionary of all known modules for the m5mbridge controller and their
-# respective names.
-ALL_MODULES = dict(m5=M5Module, mcpat=McPatModule)
+# respective names. The modules are referenced by the module path and class
+# name of their constructor and imported only when they are registered. This
+# keeps importing this file cheap, it is imported for example by the option
+# parser of the command line tool that does not use any of the modules.
+ALL_MODULES = dict(
+        m5='modules.m5.module.M5Module',
+        mcpat='modules.mcpat.module.McPatModule')
 
 # Our singleton controller instance
 controller = None
@@ -37,6 +33,7 @@ def getController(options = None):
 
 def initM5MBridge(options):
     global controller
+    import factory
     controller = factory.createController()
     controller.setOptions(options)
     registerModules(controller, options)
@@ -49,7 +46,13 @@ def registerModules(controller, options):
         toLoad = ALL_MODULES.keys()
 
     for name in toLoad:
-        ctor = ALL_MODULES[name]
+        ctor = loadModule(name)
         controller.registerModule(name, ctor())
 
+def loadModule(name):
+    '''Import the module registered as `name' and return its constructor.'''
+    modulePath, className = ALL_MODULES[name].rsplit('.', 1)
+    module = __import__(modulePath, globals(), locals(), [className])
+    return getattr(module, className)
+
 __all__ = [ 'getController' ]
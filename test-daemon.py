@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Round trip through the conversion daemon: the run directory is converted by
+# the daemon on behalf of a client and in-process, both power.xml must be the
+# same. The arguments of the request are sent as JSON, the daemon decodes
+# them as unicode strings, -S checks that they are passed on as str.
+#
+# Usage: python test-daemon.py RUN_DIR
+
+from m5mbridge import daemon
+
+runDir = os.path.abspath(sys.argv[1])
+parser = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'm5-mcpat-parser')
+socketPath = os.path.join(tempfile.mkdtemp(), 'daemon.sock')
+args = ['-c', 'cpu', '-y', '', '-S', 'system']
+
+server = subprocess.Popen([sys.executable, parser, '--daemon=' + socketPath])
+try:
+    for i in range(100):
+        if os.path.exists(socketPath):
+            break
+        time.sleep(0.1)
+
+    response = daemon.request(socketPath, runDir, args + ['-p', 'power-daemon.xml'])
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    assert response['exit_code'] == 0, response['exit_code']
+finally:
+    server.terminate()
+    server.wait()
+
+subprocess.check_call([sys.executable, parser] + args + ['-p', 'power-local.xml'], cwd=runDir)
+
+daemonPower = open(os.path.join(runDir, 'power-daemon.xml')).read()
+localPower = open(os.path.join(runDir, 'power-local.xml')).read()
+assert daemonPower == localPower, 'the daemon and the in-process conversion differ'
+print 'OK'
@@ -0,0 +1,49 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Benchmark of --parse_workers: a large synthetic stats file is written by
+# repeating the dumps of a stats file, and parsed by a single process and by
+# a pool of workers. Both must return the same stats, the parse times are
+# printed. The workers only pay off with as many CPU cores as workers, which
+# is why --parse_workers is 1 by default.
+#
+# Usage: python test-parseworkers.py STATS_FILE [WORKERS] [SIZE_MB]
+
+from m5mbridge.machine import options
+from m5mbridge.modules.m5.importer.parallelparser import MIN_PARALLEL_SIZE, parseStatsFileParallel
+from m5mbridge.modules.m5.importer.stats import M5StatsParser
+
+workers = len(sys.argv) > 2 and int(sys.argv[2]) or 4
+size = len(sys.argv) > 3 and int(sys.argv[3]) << 20 or 2 * MIN_PARALLEL_SIZE
+
+opts = options.parse(['test-parseworkers.py', '--parse_workers={0}'.format(workers)])
+
+tmpDir = tempfile.mkdtemp()
+try:
+    path = os.path.join(tmpDir, 'stats.txt')
+    dumps = open(sys.argv[1], 'rb').read()
+    with open(path, 'wb') as f:
+        while f.tell() < size:
+            f.write(dumps)
+    print 'parsing {0:.0f}MB of stats on {1} CPUs'.format(os.path.getsize(path) / float(1 << 20), os.sysconf('SC_NPROCESSORS_ONLN'))
+
+    start = time.time()
+    with open(path, 'rb') as f:
+        single = M5StatsParser(f, opts).run()
+    singleTime = time.time() - start
+    print '1 worker: {0:.1f}s'.format(singleTime)
+
+    start = time.time()
+    parallel = parseStatsFileParallel(path, opts, None, workers)
+    parallelTime = time.time() - start
+    print '{0} workers: {1:.1f}s, speedup {2:.2f}'.format(workers, parallelTime, singleTime / parallelTime)
+
+    # nan != nan, e.g., avg_blocked_cycles without blocked cycles.
+    same = lambda a, b: a == b or a != a and b != b
+    assert set(parallel) == set(single) and all(same(parallel[key], single[key]) for key in single), 'the workers and the single process parsed different stats'
+finally:
+    shutil.rmtree(tmpDir)
+print 'OK'
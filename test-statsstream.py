@@ -0,0 +1,41 @@
+import sys
+import time
+
+# Regression check for the stats stream of the live bridge: the same dump is
+# written 1000 times into the text stream of the M5Module and imported after
+# every write, like gem5 does on every stats dump. Only the new dump must be
+# parsed, i.e., the import time per dump must not grow with the number of
+# dumps and the stream must be empty after every import.
+#
+# Usage: python test-statsstream.py CONFIG_FILE STATS_FILE
+
+from m5mbridge.machine import options
+from m5mbridge.modules.m5.importer import machinefactory
+from m5mbridge.modules.m5.module import M5Module
+from m5.stats import StatsDumpSimulator
+
+DUMPS = 1000
+# The number of dumps whose import times are compared.
+WINDOW = 100
+
+opts = options.parse(['test-statsstream.py', '-c', 'cpu'])
+machine = machinefactory.createFromConfigFile(sys.argv[1], opts)
+module = M5Module()
+
+stats = StatsDumpSimulator(sys.argv[2])
+dump = stats.nextDump()
+
+times = []
+for i in range(DUMPS):
+    module.output.write(dump)
+    start = time.time()
+    module.importStats(machine)
+    times.append(time.time() - start)
+    assert not module.output.str(), 'the stream was not emptied by dump {0}'.format(i)
+
+# The first import routes all stats, it is not compared.
+first = sum(times[1:WINDOW+1]) / WINDOW
+last = sum(times[-WINDOW:]) / WINDOW
+print 'import time per dump: {0:.2f}ms for the first {2} dumps, {1:.2f}ms for the last {2} dumps'.format(first*1e3, last*1e3, WINDOW)
+assert last < 2 * first, 'the import time per dump grows with the number of dumps'
+print 'OK'